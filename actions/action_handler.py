@@ -6,7 +6,7 @@
 # Decides: auto-deploy vs human review based on confidence + risk.
 
 import logging
-import threading
+from concurrent.futures import ThreadPoolExecutor
 from ingestion.event_schema import IncidentReport, RegressionEvent
 from actions.slack_notifier import (
     send_incident_alert, send_resolution_message, send_failure_alert
@@ -20,6 +20,14 @@ import config
 
 logger = logging.getLogger(__name__)
 
+# Verifications mostly sleep between latency polls - a few shared
+# workers cover every active incident instead of one fresh thread each
+VERIFIER_WORKERS = 4
+_verifier_pool = ThreadPoolExecutor(
+    max_workers=VERIFIER_WORKERS,
+    thread_name_prefix="verifier"
+)
+
 
 class ActionHandler:
     
@@ -78,7 +86,7 @@ class ActionHandler:
             )
             return
         
-        # Start verifier in background
+        # Hand verification to the shared verifier pool
         def on_resolved(resolve_time):
             send_resolution_message(
                 report.incident_id,
@@ -96,20 +104,25 @@ class ActionHandler:
                 "Fix deployed but latency did not recover"
             )
         
-        threading.Thread(
-            target=verify_fix,
-            args=(
-                report.regression.affected_endpoint,
-                report.characterization.latency_before_ms,
-                report.incident_id,
-                self.hot_store,
-                self.kg,
-                on_resolved,
-                on_failed
-            ),
-            daemon=True
-        ).start()
+        future = _verifier_pool.submit(
+            verify_fix,
+            report.regression.affected_endpoint,
+            report.characterization.latency_before_ms,
+            report.incident_id,
+            self.hot_store,
+            self.kg,
+            on_resolved,
+            on_failed
+        )
+        future.add_done_callback(_log_verifier_error)
     
     def handle_failure(self, regression: RegressionEvent, error: str):
         """Called when investigation itself fails"""
-        send_failure_alert(regression, error)
\ No newline at end of file
+        send_failure_alert(regression, error)
+
+
+def _log_verifier_error(future):
+    """Pool futures swallow exceptions - surface them in the log"""
+    error = future.exception()
+    if error:
+        logger.error(f"Verifier failed: {error}")
@@ -8,11 +8,16 @@
 # 2. Risk level is "low"
 # 3. Fake CI checks pass
 
+import functools
 import logging
+import mmap
 import os
 import time
 import subprocess
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from git import Repo
 from ingestion.event_schema import FixPackage
 import config
 
@@ -21,23 +26,41 @@ logger = logging.getLogger(__name__)
 # PID file so we can kill and restart the Flask app
 APP_PID_FILE = "app.pid"
 
+# Restart: how long to wait for the old app to exit / new app to answer
+APP_EXIT_TIMEOUT_SEC = 5
+APP_START_TIMEOUT_SEC = 20
+
+# Fake CI: how many probe requests, and how many in flight at once
+CI_REQUEST_COUNT = 20
+CI_CONCURRENCY = 5
+CI_MAX_AVG_LATENCY_MS = 200
+CI_MAX_ERROR_RATE = 0.05
+
+# One keep-alive pool for CI probes and restart health checks, sized so
+# every concurrent CI probe gets its own connection
+_http = requests.Session()
+_http.mount("http://", HTTPAdapter(pool_connections=4,
+                                   pool_maxsize=CI_CONCURRENCY))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_git_repo() -> Repo:
+    """Open the working repo once and reuse it for every auto-deploy"""
+    return Repo(".")
+
 
 def should_auto_deploy(fix: FixPackage, confidence: float) -> bool:
     """
     Gate that determines if it's safe to auto-deploy.
     All three conditions must be true.
     """
-    conditions = {
-        "confidence_high": confidence >= config.AUTO_MERGE_CONFIDENCE,
-        "risk_low":        fix.risk_level == "low",
-        "no_side_effects": len(fix.side_effects) == 0
-    }
-    
-    failed = [k for k, v in conditions.items() if not v]
+    failed = _failed_deploy_conditions(
+        confidence, fix.risk_level, len(fix.side_effects)
+    )
     
     if failed:
         logger.info(
-            f"Auto-deploy blocked: {', '.join(failed)} | "
+            f"Auto-deploy blocked: {failed} | "
             f"Confidence: {confidence:.0%} | Risk: {fix.risk_level}"
         )
         return False
@@ -46,52 +69,95 @@ def should_auto_deploy(fix: FixPackage, confidence: float) -> bool:
     return True
 
 
+# Bit i of the failure mask set = DEPLOY_CONDITIONS[i] not met
+DEPLOY_CONDITIONS = ("confidence_high", "risk_low", "no_side_effects")
+_FAILURE_LABELS = [
+    ", ".join(name for bit, name in enumerate(DEPLOY_CONDITIONS)
+              if mask & (1 << bit))
+    for mask in range(1 << len(DEPLOY_CONDITIONS))
+]
+
+
+@functools.lru_cache(maxsize=256)
+def _failed_deploy_conditions(confidence: float, risk_level: str,
+                              side_effect_count: int) -> str:
+    """Comma-separated names of the unmet conditions, "" if none"""
+    mask = (
+        (confidence < config.AUTO_MERGE_CONFIDENCE)
+        | (risk_level != "low") << 1
+        | (side_effect_count != 0) << 2
+    )
+    return _FAILURE_LABELS[mask]
+
+
 def run_ci_check() -> bool:
     """
     Fake CI: make 20 test requests and verify latency is acceptable.
     Returns True if app looks healthy, False if still broken.
     """
-    logger.info("Running CI check (20 test requests)...")
+    logger.info(f"Running CI check ({CI_REQUEST_COUNT} test requests)...")
     
-    latencies = []
+    total_latency_ms = 0.0
+    responses = 0
     errors = 0
     
-    for i in range(20):
-        try:
-            start = time.time()
-            resp = requests.get(
-                f"http://localhost:{config.APP_PORT}/checkout",
-                timeout=5
-            )
-            elapsed_ms = (time.time() - start) * 1000
-            latencies.append(elapsed_ms)
-            
-            if resp.status_code >= 500:
-                errors += 1
-                
-        except Exception:
-            errors += 1
+    # Probes are independent - run them concurrently instead of back to back
+    with ThreadPoolExecutor(max_workers=CI_CONCURRENCY) as pool:
+        futures = [pool.submit(_ci_probe) for _ in range(CI_REQUEST_COUNT)]
         
-        time.sleep(0.2)
+        for future in as_completed(futures):
+            elapsed_ms, failed = future.result()
+            if elapsed_ms is not None:
+                total_latency_ms += elapsed_ms
+                responses += 1
+            if failed:
+                errors += 1
+                if errors / CI_REQUEST_COUNT >= CI_MAX_ERROR_RATE:
+                    # Error budget spent - CI can't pass, skip the rest
+                    # (by hand: shutdown's cancel_futures needs 3.9+)
+                    for pending in futures:
+                        pending.cancel()
+                    break
     
-    if not latencies:
+    if errors / CI_REQUEST_COUNT >= CI_MAX_ERROR_RATE:
+        logger.error(
+            f"CI check: errors={errors}/{CI_REQUEST_COUNT}, error budget "
+            f"spent - skipped remaining probes | ❌ FAILED"
+        )
+        return False
+    
+    if not responses:
         logger.error("CI check: no responses received")
         return False
     
-    avg_latency = sum(latencies) / len(latencies)
-    error_rate = errors / 20
+    avg_latency = total_latency_ms / responses
+    error_rate = errors / CI_REQUEST_COUNT
     
-    passed = avg_latency < 200 and error_rate < 0.05
+    passed = avg_latency < CI_MAX_AVG_LATENCY_MS and error_rate < CI_MAX_ERROR_RATE
     
     logger.info(
         f"CI check: avg_latency={avg_latency:.1f}ms | "
-        f"errors={errors}/20 | "
+        f"errors={errors}/{CI_REQUEST_COUNT} | "
         f"{'✅ PASSED' if passed else '❌ FAILED'}"
     )
     
     return passed
 
 
+def _ci_probe():
+    """One CI request. Returns (elapsed_ms or None, failed)"""
+    try:
+        start = time.time()
+        resp = _http.get(
+            f"http://localhost:{config.APP_PORT}/checkout",
+            timeout=5
+        )
+        elapsed_ms = (time.time() - start) * 1000
+        return elapsed_ms, resp.status_code >= 500
+    except Exception:
+        return None, True
+
+
 def apply_fix_and_restart(fix: FixPackage, file_path: str = "app/db.py") -> bool:
     """
     Apply the code fix directly and restart the Flask app.
@@ -99,30 +165,27 @@ def apply_fix_and_restart(fix: FixPackage, file_path: str = "app/db.py") -> bool
     """
     logger.info(f"Applying fix to {file_path}...")
     
-    # ── Read current file ─────────────────────────────────────────────────
-    with open(file_path, "r") as f:
-        current_content = f.read()
-    
     # ── Apply the fix ─────────────────────────────────────────────────────
-    if fix.original_code not in current_content:
+    if not _patch_file(file_path, fix.original_code, fix.fixed_code):
         logger.error("Cannot apply fix: original code not found in file")
         return False
     
-    new_content = current_content.replace(fix.original_code, fix.fixed_code, 1)
-    
-    with open(file_path, "w") as f:
-        f.write(new_content)
-    
     logger.info("Fix written to file ✅")
     
     # ── Commit the fix ────────────────────────────────────────────────────
-    subprocess.run(["git", "add", file_path])
-    subprocess.run([
-        "git", "commit", "-m",
-        f"fix: auto-applied by Firetiger agent - {fix.fix_summary}"
-    ])
+    # In-process via GitPython's index - no git add/commit fork+exec
+    try:
+        repo = _get_git_repo()
+        repo.index.add([file_path])
+        repo.index.commit(
+            f"fix: auto-applied by Firetiger agent - {fix.fix_summary}"
+        )
+    except Exception as e:
+        logger.warning(f"Could not commit fix: {e}")
     
     # Clear commit SHA cache so new events get tagged with new SHA
+    # Imported here: app.middleware starts its event sender thread on
+    # import, which the agent process has no use for
     from app.middleware import clear_commit_cache
     clear_commit_cache()
     
@@ -135,7 +198,9 @@ def apply_fix_and_restart(fix: FixPackage, file_path: str = "app/db.py") -> bool
             old_pid = int(f.read().strip())
         try:
             os.kill(old_pid, 15)  # SIGTERM
-            time.sleep(2)
+            # Return as soon as the port is free instead of a fixed sleep
+            if not _wait_for_exit(old_pid, APP_EXIT_TIMEOUT_SEC):
+                logger.warning(f"Old app (PID {old_pid}) still running")
         except ProcessLookupError:
             pass
     
@@ -149,20 +214,69 @@ def apply_fix_and_restart(fix: FixPackage, file_path: str = "app/db.py") -> bool
     with open(APP_PID_FILE, "w") as f:
         f.write(str(proc.pid))
     
-    # Wait for app to come up
+    # Wait for app to come up - probe early, back off up to 1s per try
     logger.info("Waiting for app to restart...")
-    for _ in range(10):
-        time.sleep(2)
+    deadline = time.time() + APP_START_TIMEOUT_SEC
+    delay = 0.1
+    while time.time() < deadline:
         try:
-            resp = requests.get(
+            resp = _http.get(
                 f"http://localhost:{config.APP_PORT}/health",
-                timeout=2
+                timeout=1
             )
             if resp.status_code == 200:
                 logger.info("App restarted successfully ✅")
                 return True
         except Exception:
             pass
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
     
     logger.error("App did not restart in time ❌")
-    return False
\ No newline at end of file
+    return False
+
+
+def _wait_for_exit(pid: int, timeout: float) -> bool:
+    """Wait until a process has exited. Returns False on timeout."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            # Reaps the process if it is our child (an earlier restart)
+            done, _ = os.waitpid(pid, os.WNOHANG)
+            if done:
+                return True
+        except ChildProcessError:
+            # Not our child - just check whether it still exists
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return True
+        time.sleep(0.05)
+    return False
+
+
+def _patch_file(file_path: str, original: str, replacement: str) -> bool:
+    """
+    Replace the first occurrence of original in the file, in place.
+    Searches a read-only mmap instead of decoding the whole file into a
+    str, and only rewrites the bytes from the match onwards.
+    Returns False if original isn't in the file.
+    """
+    original_bytes = original.encode("utf-8")
+    replacement_bytes = replacement.encode("utf-8")
+    
+    with open(file_path, "r+b") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False  # mmap can't map an empty file
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = mm.find(original_bytes)
+            if pos == -1:
+                return False
+            tail = mm[pos + len(original_bytes):]
+        
+        f.seek(pos)
+        f.write(replacement_bytes + tail)
+        f.truncate()
+    
+    return True
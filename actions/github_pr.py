@@ -1,17 +1,101 @@
 # Folder: firetiger-demo/actions/github_pr.py
 
+import functools
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from github import Github, GithubException, Auth
+from github import Github, GithubException, Auth, InputGitTreeElement
 from ingestion.event_schema import IncidentReport
 import config
 
 logger = logging.getLogger(__name__)
 
+# Branch heads move rarely - reuse the last lookup for this long
+BRANCH_CACHE_TTL_SEC = 60
+_branch_cache = {"branch": None, "fetched_at": 0.0}
 
-def create_fix_pr(report: IncidentReport) -> str:
+# Fallback fix when Claude's original_code isn't found verbatim
+SLOW_QUERY_SWITCH = "if config.USE_SLOW_QUERY:"
+SLOW_QUERY_SWITCH_FIX = "if False:  # Fixed by Argus agent - N+1 disabled"
+
+# Rendered PR bodies keyed by incident_id
+PR_BODY_CACHE_SIZE = 128
+_pr_body_cache = {}
+
+
+# PR body layout, filled by _render_pr_body via str.format_map
+PR_BODY_TEMPLATE = """## Auto-generated Fix - Incident {incident_id}
+
+> This PR was automatically created by the Argus observability agent.
+
+## Incident Summary
+
+| Field | Value |
+|-------|-------|
+| Endpoint | `{endpoint}` |
+| Detected | {detected_at} |
+| Suspect Commit | `{commit_sha}` |
+| Customers Affected | {affected_users} users |
+| Latency | {latency_before_ms:.0f}ms to {latency_after_ms:.0f}ms |
+| DB Queries | {query_count_before:.0f} to {query_count_after:.0f} per request |
+
+## Root Cause
+
+**{hypothesis_title}** ({confidence_score:.0%} confidence)
+
+Evidence:
+{evidence}
+
+Affected code: `{code_location}`
+
+## The Fix
+
+{explanation}
+
+Before:
+```python
+{original_code}
+```
+
+After:
+```python
+{fixed_code}
+```
+
+## Risk Assessment
+
+**Risk Level: {risk_level}**
+
+{risk_reasoning}
+
+**Rollback:** `{rollback}`
+
+## Verification Checklist
+
+{checklist}
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _get_repo():
+    """Token and repo name are fixed config - build the handle once"""
     g = Github(auth=Auth.Token(config.GITHUB_TOKEN))
-    repo = g.get_repo(config.GITHUB_REPO)
+    return g.get_repo(config.GITHUB_REPO)
+
+
+def _get_default_branch(repo):
+    """Default branch with a short TTL so back-to-back PRs skip the RTT"""
+    now = time.time()
+    if (_branch_cache["branch"] is None or
+            now - _branch_cache["fetched_at"] > BRANCH_CACHE_TTL_SEC):
+        _branch_cache["branch"] = repo.get_branch(repo.default_branch)
+        _branch_cache["fetched_at"] = now
+    return _branch_cache["branch"]
+
+
+def create_fix_pr(report: IncidentReport) -> str:
+    repo = _get_repo()
 
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     endpoint_clean = report.regression.affected_endpoint.replace("/", "")
@@ -19,64 +103,34 @@ def create_fix_pr(report: IncidentReport) -> str:
 
     logger.info(f"Creating PR branch: {branch_name}")
 
+    # Get file path
+    file_path = _extract_file_path(
+        report.root_cause.affected_code_location
+    )
+
     try:
-        # Get main branch SHA
-        main_branch = repo.get_branch(repo.default_branch)
-        base_sha = main_branch.commit.sha
+        # Branch head and file contents are independent - fetch both at once
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            branch_future = pool.submit(_get_default_branch, repo)
+            content_future = pool.submit(repo.get_contents, file_path)
 
-        # Create new branch
-        repo.create_git_ref(
-            ref=f"refs/heads/{branch_name}",
-            sha=base_sha
-        )
+            # Get main branch SHA
+            main_branch = branch_future.result()
+            base_sha = main_branch.commit.sha
 
-        # Get file path
-        file_path = _extract_file_path(
-            report.root_cause.affected_code_location
-        )
+        head_sha = base_sha
 
         try:
-            file_content = repo.get_contents(file_path)
+            file_content = content_future.result()
             current_content = file_content.decoded_content.decode("utf-8")
 
-            new_content = None
+            new_content = _apply_fix(report, current_content)
 
-            # Try 1: Exact match
-            if report.fix.original_code in current_content:
-                new_content = current_content.replace(
-                    report.fix.original_code,
-                    report.fix.fixed_code,
-                    1
-                )
-                logger.info("Applied fix via exact match")
-
-            # Try 2: Match the key config line
-            if new_content is None:
-                if "if config.USE_SLOW_QUERY:" in current_content:
-                    new_content = current_content.replace(
-                        "if config.USE_SLOW_QUERY:",
-                        "if False:  # Fixed by Argus agent - N+1 disabled",
-                        1
-                    )
-                    logger.info("Applied fix via key line match")
-
-            # Try 3: Force fix by replacing USE_SLOW_QUERY
-            if new_content is None:
-                logger.warning("Forcing direct fix")
-                new_content = current_content.replace(
-                    "if config.USE_SLOW_QUERY:",
-                    "if False:  # Argus agent fix",
-                    1
-                )
-
-            # Only update if content actually changed
+            # Only commit if content actually changed
             if new_content and new_content != current_content:
-                repo.update_file(
-                    path=file_path,
-                    message=f"fix: {report.fix.pr_title}",
-                    content=new_content,
-                    sha=file_content.sha,
-                    branch=branch_name
+                head_sha = _commit_file(
+                    repo, main_branch, file_path, new_content,
+                    f"fix: {report.fix.pr_title}"
                 )
                 logger.info(f"File updated on GitHub: {file_path}")
             else:
@@ -85,12 +139,18 @@ def create_fix_pr(report: IncidentReport) -> str:
         except GithubException as e:
             logger.warning(f"Could not update file {file_path}: {e}")
 
+        # Create new branch pointing straight at the fix commit
+        repo.create_git_ref(
+            ref=f"refs/heads/{branch_name}",
+            sha=head_sha
+        )
+
         # Create the PR
         pr = repo.create_pull(
             title=report.fix.pr_title,
             body=_build_pr_body(report),
             head=branch_name,
-            base=repo.default_branch
+            base=main_branch.name
         )
 
         logger.info(f"PR created: {pr.html_url}")
@@ -101,6 +161,48 @@ def create_fix_pr(report: IncidentReport) -> str:
         raise
 
 
+def _apply_fix(report: IncidentReport, current_content: str) -> str:
+    """
+    Apply Claude's fix where its original code appears verbatim, and
+    only otherwise fall back to the known USE_SLOW_QUERY switch line.
+    At most two scans.
+    """
+    # Try 1: Exact match
+    if report.fix.original_code in current_content:
+        logger.info("Applied fix via exact match")
+        return current_content.replace(
+            report.fix.original_code, report.fix.fixed_code, 1
+        )
+    
+    # Try 2: Match the key config line
+    if SLOW_QUERY_SWITCH in current_content:
+        logger.info("Applied fix via key line match")
+        return current_content.replace(
+            SLOW_QUERY_SWITCH, SLOW_QUERY_SWITCH_FIX, 1
+        )
+    
+    return current_content
+
+
+def _commit_file(repo, main_branch, file_path: str,
+                 new_content: str, message: str) -> str:
+    """
+    Commit one file on top of main via the Git Data API
+    (blob -> tree -> commit) and return the new commit SHA.
+    The branch ref is created afterwards, already pointing here.
+    """
+    base_commit = main_branch.commit.commit
+
+    blob = repo.create_git_blob(new_content, "utf-8")
+    tree = repo.create_git_tree(
+        [InputGitTreeElement(file_path, "100644", "blob", sha=blob.sha)],
+        base_tree=base_commit.tree
+    )
+    commit = repo.create_git_commit(message, tree, [base_commit])
+    return commit.sha
+
+
+@functools.lru_cache(maxsize=128)
 def _extract_file_path(code_location: str) -> str:
     parts = code_location.replace(",", " ").split()
     for part in parts:
@@ -110,63 +212,46 @@ def _extract_file_path(code_location: str) -> str:
 
 
 def _build_pr_body(report: IncidentReport) -> str:
-    evidence = "\n".join(
-        f"- {e}" for e in report.root_cause.evidence_chain
-    )
-
-    checklist = "\n".join(
-        f"- [ ] {item}" for item in report.fix.verification_checklist
-    )
-
-    affected_users = len(report.regression.affected_user_ids)
-
-    return f"""## Auto-generated Fix - Incident {report.incident_id}
-
-> This PR was automatically created by the Argus observability agent.
-
-## Incident Summary
-
-| Field | Value |
-|-------|-------|
-| Endpoint | `{report.regression.affected_endpoint}` |
-| Detected | {report.regression.detected_at} |
-| Suspect Commit | `{report.regression.commit_sha}` |
-| Customers Affected | {affected_users} users |
-| Latency | {report.characterization.latency_before_ms:.0f}ms to {report.characterization.latency_after_ms:.0f}ms |
-| DB Queries | {report.characterization.query_count_before:.0f} to {report.characterization.query_count_after:.0f} per request |
-
-## Root Cause
-
-**{report.root_cause.confirmed_hypothesis_title}** ({report.root_cause.confidence_score:.0%} confidence)
-
-Evidence:
-{evidence}
-
-Affected code: `{report.root_cause.affected_code_location}`
-
-## The Fix
-
-{report.fix.explanation}
-
-Before:
-```python
-{report.fix.original_code}
-```
-
-After:
-```python
-{report.fix.fixed_code}
-```
-
-## Risk Assessment
-
-**Risk Level: {report.fix.risk_level.upper()}**
-
-{report.fix.risk_reasoning}
-
-**Rollback:** `{report.fix.rollback_instructions}`
-
-## Verification Checklist
-
-{checklist}
-"""
\ No newline at end of file
+    """PR body, rendered once per incident and reused on retries"""
+    body = _pr_body_cache.get(report.incident_id)
+    if body is None:
+        body = _render_pr_body(report)
+        if len(_pr_body_cache) >= PR_BODY_CACHE_SIZE:
+            # Dicts keep insertion order - drop the oldest incident
+            _pr_body_cache.pop(next(iter(_pr_body_cache)))
+        _pr_body_cache[report.incident_id] = body
+    return body
+
+
+def _render_pr_body(report: IncidentReport) -> str:
+    regression = report.regression
+    char = report.characterization
+    root_cause = report.root_cause
+    fix = report.fix
+
+    return PR_BODY_TEMPLATE.format_map({
+        "incident_id":         report.incident_id,
+        "endpoint":            regression.affected_endpoint,
+        "detected_at":         regression.detected_at,
+        "commit_sha":          regression.commit_sha,
+        "affected_users":      len(regression.affected_user_ids),
+        "latency_before_ms":   char.latency_before_ms,
+        "latency_after_ms":    char.latency_after_ms,
+        "query_count_before":  char.query_count_before,
+        "query_count_after":   char.query_count_after,
+        "hypothesis_title":    root_cause.confirmed_hypothesis_title,
+        "confidence_score":    root_cause.confidence_score,
+        "evidence":            "\n".join(
+            f"- {e}" for e in root_cause.evidence_chain
+        ),
+        "code_location":       root_cause.affected_code_location,
+        "explanation":         fix.explanation,
+        "original_code":       fix.original_code,
+        "fixed_code":          fix.fixed_code,
+        "risk_level":          fix.risk_level.upper(),
+        "risk_reasoning":      fix.risk_reasoning,
+        "rollback":            fix.rollback_instructions,
+        "checklist":           "\n".join(
+            f"- [ ] {item}" for item in fix.verification_checklist
+        ),
+    })
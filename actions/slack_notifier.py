@@ -5,6 +5,9 @@
 # Two types: incident alert and resolution confirmation.
 
 import logging
+import queue
+import threading
+import time
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from ingestion.event_schema import IncidentReport, RegressionEvent
@@ -13,6 +16,58 @@ import config
 logger = logging.getLogger(__name__)
 client = WebClient(token=config.SLACK_BOT_TOKEN)
 
+# Slack allows ~1 message per second per channel
+MIN_SEND_INTERVAL_SEC = 1.0
+MAX_SEND_ATTEMPTS = 5
+
+# Messages are posted by one background worker so callers never wait
+# on Slack. Each item is the kwargs for client.chat_postMessage.
+_slack_queue = queue.Queue()
+
+
+def _drain_queue():
+    """Worker loop: send queued messages, paced and retried on rate limits"""
+    last_send = 0.0
+    
+    while True:
+        message = _slack_queue.get()
+        backoff = 1.0
+        
+        for attempt in range(MAX_SEND_ATTEMPTS):
+            wait = MIN_SEND_INTERVAL_SEC - (time.time() - last_send)
+            if wait > 0:
+                time.sleep(wait)
+            
+            try:
+                last_send = time.time()
+                client.chat_postMessage(
+                    channel=config.SLACK_CHANNEL_ID, **message
+                )
+                logger.info(f"Slack message sent: {message['text']}")
+                break
+            
+            except SlackApiError as e:
+                if e.response.status_code != 429:
+                    logger.error(f"Slack error: {e}")
+                    break
+                
+                # Rate limited - honor Retry-After, else back off exponentially
+                retry_after = e.response.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after else backoff
+                backoff *= 2
+                logger.warning(f"Slack rate limited, retrying in {delay:.0f}s")
+                time.sleep(delay)
+            
+            except Exception as e:
+                # Never let a network error kill the worker thread
+                logger.error(f"Slack send failed: {e}")
+                break
+        
+        _slack_queue.task_done()
+
+
+threading.Thread(target=_drain_queue, daemon=True).start()
+
 
 def send_incident_alert(report: IncidentReport, pr_url: str = None):
     """
@@ -102,16 +157,11 @@ def send_incident_alert(report: IncidentReport, pr_url: str = None):
             ]
         })
     
-    try:
-        client.chat_postMessage(
-            channel=config.SLACK_CHANNEL_ID,
-            blocks=blocks,
-            text=f"Regression detected on {report.regression.affected_endpoint}"
-        )
-        logger.info(f"Slack alert sent for incident {report.incident_id}")
-        
-    except SlackApiError as e:
-        logger.error(f"Slack error: {e}")
+    _slack_queue.put({
+        "blocks": blocks,
+        "text": f"Regression detected on {report.regression.affected_endpoint}"
+    })
+    logger.info(f"Slack alert queued for incident {report.incident_id}")
 
 
 def send_resolution_message(incident_id: str, endpoint: str,
@@ -120,39 +170,31 @@ def send_resolution_message(incident_id: str, endpoint: str,
     minutes = int(time_to_resolve_sec / 60)
     seconds = int(time_to_resolve_sec % 60)
     
-    try:
-        client.chat_postMessage(
-            channel=config.SLACK_CHANNEL_ID,
-            blocks=[
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": (
-                            f"✅ *Incident Resolved*\n"
-                            f"Endpoint `{endpoint}` is back to normal.\n"
-                            f"*Total time: {minutes}m {seconds}s* | "
-                            f"Zero humans paged."
-                        )
-                    }
+    _slack_queue.put({
+        "blocks": [
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": (
+                        f"✅ *Incident Resolved*\n"
+                        f"Endpoint `{endpoint}` is back to normal.\n"
+                        f"*Total time: {minutes}m {seconds}s* | "
+                        f"Zero humans paged."
+                    )
                 }
-            ],
-            text=f"Incident resolved: {endpoint}"
-        )
-    except SlackApiError as e:
-        logger.error(f"Slack error: {e}")
+            }
+        ],
+        "text": f"Incident resolved: {endpoint}"
+    })
 
 
 def send_failure_alert(regression: RegressionEvent, error: str):
     """Send alert when automated investigation fails - needs human"""
-    try:
-        client.chat_postMessage(
-            channel=config.SLACK_CHANNEL_ID,
-            text=(
-                f"⚠️ Automated investigation failed for "
-                f"`{regression.affected_endpoint}`. "
-                f"Manual investigation needed. Error: {error[:200]}"
-            )
+    _slack_queue.put({
+        "text": (
+            f"⚠️ Automated investigation failed for "
+            f"`{regression.affected_endpoint}`. "
+            f"Manual investigation needed. Error: {error[:200]}"
         )
-    except SlackApiError as e:
-        logger.error(f"Slack error: {e}")
\ No newline at end of file
+    })
\ No newline at end of file
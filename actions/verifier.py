@@ -17,6 +17,11 @@ VERIFICATION_TIMEOUT_SEC = 300  # Give it 5 minutes to recover
 SAMPLE_SIZE = 50                # Watch this many requests
 RECOVERY_THRESHOLD = 1.3        # Must be within 30% of baseline
 
+# Polling: first check after 0.5s, growing to one every 10s
+POLL_INITIAL_DELAY_SEC = 0.5
+POLL_BACKOFF_FACTOR = 1.5
+POLL_MAX_DELAY_SEC = 10
+
 
 def verify_fix(endpoint: str, baseline_latency_ms: float,
                incident_id: str, hot_store: HotStore,
@@ -37,8 +42,12 @@ def verify_fix(endpoint: str, baseline_latency_ms: float,
     start_time = time.time()
     threshold_ms = baseline_latency_ms * RECOVERY_THRESHOLD
     
+    # Check early and back off - a quick recovery is noticed in seconds
+    delay = POLL_INITIAL_DELAY_SEC
+    
     while time.time() - start_time < VERIFICATION_TIMEOUT_SEC:
-        time.sleep(10)
+        time.sleep(delay)
+        delay = min(delay * POLL_BACKOFF_FACTOR, POLL_MAX_DELAY_SEC)
         
         # Check recent latency
         recent_latency = hot_store.get_recent_latency(endpoint, minutes=2)
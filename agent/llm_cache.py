@@ -0,0 +1,254 @@
+# Folder: firetiger-demo/agent/llm_cache.py
+#
+# Exact-match prompt cache in front of every Claude call.
+# Same prompt + model + max_tokens = same answer, no API round trip.
+#
+# Two tiers:
+# - L1: in-process LRU (OrderedDict)
+# - L2: SQLite file, survives agent restarts
+#
+# Only responses that parse as JSON are cached, so a bad answer
+# never gets replayed.
+#
+# Misses are streamed, and the stream is closed as soon as a complete
+# JSON object has arrived.
+#
+# Steps with a pydantic output model can use cached_tool_call instead:
+# Claude is forced to call a tool whose input schema is the model, so
+# the answer arrives as a dict and never goes through the text parser.
+
+import functools
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Type
+from pydantic import BaseModel
+from agent.response_parser import parse_claude_response
+import config
+
+logger = logging.getLogger(__name__)
+
+MEMORY_CACHE_SIZE = 512
+_decoder = json.JSONDecoder()
+
+
+class PromptCache:
+    """
+    Maps sha256(model, max_tokens, prompt) → raw Claude response text.
+    Thread-safe: investigations run on detector-spawned threads.
+    """
+
+    def __init__(self, db_path: str = config.LLM_CACHE_DB_PATH,
+                 maxsize: int = MEMORY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS prompt_cache (
+                key         TEXT PRIMARY KEY,
+                response    TEXT NOT NULL,
+                created_at  REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(model: str, max_tokens: int, prompt: str) -> str:
+        return hashlib.sha256(
+            f"{model}\n{max_tokens}\n{prompt}".encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._memory[key]
+
+            row = self.conn.execute(
+                "SELECT response FROM prompt_cache WHERE key = ?", [key]
+            ).fetchone()
+
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._stats["disk_hits"] += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, key: str, response: str):
+        with self._lock:
+            self._remember(key, response)
+            self.conn.execute("""
+                INSERT OR REPLACE INTO prompt_cache (key, response, created_at)
+                VALUES (?, ?, ?)
+            """, [key, response, time.time()])
+            self.conn.commit()
+
+    def discard(self, key: str):
+        """Drop an entry, e.g. one that no longer parses"""
+        with self._lock:
+            self._memory.pop(key, None)
+            self.conn.execute("DELETE FROM prompt_cache WHERE key = ?", [key])
+            self.conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters plus overall hit rate"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = sum(stats.values())
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key: str, response: str):
+        """Insert into L1, evicting least recently used. Caller holds lock."""
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+
+prompt_cache = PromptCache()
+
+
+def cached_messages_create(client, model: str, prompt: str,
+                           max_tokens: int, step_name: str) -> dict:
+    """
+    Drop-in for client.messages.create(...) + parse_claude_response().
+    Returns the parsed JSON response, from cache when possible.
+    """
+    key = PromptCache.make_key(model, max_tokens, prompt)
+
+    raw = prompt_cache.get(key)
+    if raw is not None:
+        try:
+            parsed = parse_claude_response(raw, step_name)
+            logger.info(
+                f"[{step_name}] Prompt cache hit | "
+                f"hit rate {prompt_cache.stats()['hit_rate']:.0%}"
+            )
+            return parsed
+        except ValueError:
+            prompt_cache.discard(key)
+
+    raw, parsed = _stream_and_parse(client, model, prompt, max_tokens,
+                                    step_name)
+
+    # Only cache answers we could actually use
+    prompt_cache.put(key, raw)
+    return parsed
+
+
+def _stream_and_parse(client, model: str, prompt: str, max_tokens: int,
+                      step_name: str):
+    """
+    Stream the response and stop as soon as a complete JSON object
+    has arrived, instead of waiting out any trailing prose.
+    Returns (raw_text, parsed_json).
+    """
+    chunks = []
+    opens = closes = 0
+
+    with client.messages.stream(
+        model=model,
+        max_tokens=max_tokens,
+        messages=[{"role": "user", "content": prompt}]
+    ) as stream:
+        for text in stream.text_stream:
+            chunks.append(text)
+            opens += text.count("{")
+            closes += text.count("}")
+
+            # Braces balance → likely a whole object. Braces inside
+            # strings can fool the count; then the parse just fails.
+            if opens and opens == closes:
+                raw = "".join(chunks)
+                try:
+                    parsed, _ = _decoder.raw_decode(raw, raw.find("{"))
+                    return raw, parsed
+                except json.JSONDecodeError:
+                    pass
+
+    raw = "".join(chunks)
+    return raw, parse_claude_response(raw, step_name)
+
+
+@functools.lru_cache(maxsize=None)
+def _tool_definition(tool_name: str, output_model: Type[BaseModel]) -> dict:
+    """Tool whose input schema is the step's pydantic output model"""
+    return {
+        "name": tool_name,
+        "description": f"Submit the final {output_model.__name__}.",
+        "input_schema": output_model.model_json_schema(),
+    }
+
+
+def cached_tool_call(client, model: str, prompt: str, max_tokens: int,
+                     step_name: str, tool_name: str,
+                     output_model: Type[BaseModel]) -> dict:
+    """
+    Like cached_messages_create, but gets structured output via a forced
+    tool call. Returns the tool input dict, ready for output_model(**d).
+    Only input that validates against output_model is cached.
+    """
+    tool = _tool_definition(tool_name, output_model)
+    key = PromptCache.make_key(
+        model, max_tokens, f"tool:{tool_name}\n{prompt}"
+    )
+
+    raw = prompt_cache.get(key)
+    if raw is not None:
+        try:
+            parsed = json.loads(raw)
+            output_model.model_validate(parsed)
+            logger.info(
+                f"[{step_name}] Prompt cache hit | "
+                f"hit rate {prompt_cache.stats()['hit_rate']:.0%}"
+            )
+            return parsed
+        except ValueError:
+            prompt_cache.discard(key)
+
+    response = client.messages.create(
+        model=model,
+        max_tokens=max_tokens,
+        tools=[tool],
+        tool_choice={"type": "tool", "name": tool_name},
+        messages=[{"role": "user", "content": prompt}]
+    )
+
+    parsed = next(
+        (block.input for block in response.content
+         if block.type == "tool_use"),
+        None
+    )
+    if response.stop_reason == "max_tokens":
+        # Cut off mid-answer - whatever arrived is incomplete, and caching
+        # it would replay the same truncated answer on every retry
+        raise ValueError(
+            f"[{step_name}] Claude response hit max_tokens ({max_tokens})"
+        )
+    if parsed is None:
+        # No tool call - try the text, if any
+        text = "".join(
+            block.text for block in response.content if block.type == "text"
+        )
+        parsed = parse_claude_response(text, step_name)
+
+    # Raises before caching if the answer doesn't fit the model
+    output_model.model_validate(parsed)
+
+    # Only cache answers we could actually use
+    prompt_cache.put(key, json.dumps(parsed))
+    return parsed
@@ -0,0 +1,16 @@
+# Folder: firetiger-demo/agent/llm_client.py
+#
+# The one Anthropic client for the whole agent process.
+# Every step shares its connection pool, so only the first Claude
+# call of an investigation pays for TCP + TLS setup.
+
+import anthropic
+import httpx
+import config
+
+client = anthropic.Anthropic(
+    api_key=config.ANTHROPIC_API_KEY,
+    max_retries=2,
+    # Fail fast if the API is unreachable, but give long generations time
+    timeout=httpx.Timeout(60.0, connect=5.0),
+)
@@ -2,7 +2,8 @@
 #
 # The brain that coordinates all 5 agent steps.
 # Called by the detector when a regression is confirmed.
-# Runs steps sequentially, each building on the last.
+# Runs steps sequentially, each building on the last, overlapping
+# I/O that doesn't depend on earlier steps.
 #
 # Flow:
 # RegressionEvent → characterize → hypothesize → gather_evidence
@@ -10,15 +11,21 @@
 
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from ingestion.event_schema import RegressionEvent, IncidentReport
+from ingestion.event_schema import (
+    RegressionEvent, IncidentReport,
+    Hypothesis, RootCause, FixPackage
+)
 from agent.steps.characterize import characterize
 from agent.steps.hypothesize import hypothesize
-from agent.steps.gather_evidence import gather_evidence
+from agent.steps.gather_evidence import gather_evidence, gather_shared_evidence
 from agent.steps.confirm import confirm_root_cause
 from agent.steps.fix import generate_fix
+from agent.llm_client import client as claude_client
 from storage.hot_store import HotStore
 from storage.knowledge_graph import KnowledgeGraph
+from storage.step_cache import StepCache
 
 logger = logging.getLogger(__name__)
 
@@ -33,31 +40,37 @@ class AgentOrchestrator:
     
     def __init__(self, hot_store: HotStore, 
                  knowledge_graph: KnowledgeGraph,
-                 action_handler=None):
+                 action_handler=None,
+                 step_cache: StepCache = None):
         
         self.hot_store = hot_store
         self.kg = knowledge_graph
         # action_handler will call Slack, GitHub PR, etc.
         self.action_handler = action_handler
+        # Background I/O that doesn't have to block the step chain
+        self._io_pool = ThreadPoolExecutor(max_workers=4)
+        # Completed step outputs, so a retried investigation resumes
+        self.step_cache = step_cache or StepCache()
+        # Open the Claude connection now so the first incident doesn't
+        # pay for DNS + TCP + TLS
+        self._io_pool.submit(self._warm_claude)
     
     def investigate(self, regression: RegressionEvent):
         """
         Main entry point. Called by detector.
         Runs all 5 steps and produces an IncidentReport.
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         logger.info(
-            f"\n{'='*60}\n"
-            f"🔍 INVESTIGATION STARTED\n"
-            f"Incident: {regression.incident_id}\n"
-            f"Endpoint: {regression.affected_endpoint}\n"
-            f"Commit:   {regression.commit_sha}\n"
-            f"{'='*60}"
+            "investigation_start incident=%s endpoint=%s commit=%s",
+            regression.incident_id, regression.affected_endpoint,
+            regression.commit_sha
         )
         
-        # Save incident to knowledge graph immediately
-        self.kg.save_incident({
+        # Save incident to knowledge graph in the background -
+        # step 1 doesn't need the row, so the write overlaps with it
+        kg_write = self._io_pool.submit(self.kg.save_incident, {
             "incident_id": regression.incident_id,
             "endpoint": regression.affected_endpoint,
             "started_at": regression.detected_at.isoformat(),
@@ -65,36 +78,54 @@ class AgentOrchestrator:
             "affected_user_count": len(regression.affected_user_ids)
         })
         
+        # Git diff + query patterns don't depend on the hypotheses -
+        # fetch them while steps 1 and 2 run
+        shared_evidence = self._io_pool.submit(
+            gather_shared_evidence, regression.commit_sha, self.hot_store
+        )
+        
         try:
             # ── Step 1: What is happening? ─────────────────────────────
-            step_start = time.time()
+            step_start = time.perf_counter()
+            # Never cached - it's a snapshot of live metrics, not a
+            # function of the commit
             char = characterize(regression, self.hot_store)
-            logger.info(f"Step 1 took {time.time()-step_start:.1f}s")
+            logger.info("Step 1 took %.1fs", time.perf_counter() - step_start)
             
             # ── Step 2: Why might it be happening? ────────────────────
-            step_start = time.time()
-            hypotheses = hypothesize(char, self.kg)
-            logger.info(f"Step 2 took {time.time()-step_start:.1f}s")
+            step_start = time.perf_counter()
+            hypotheses = self._run_step(
+                regression, "hypothesize", Hypothesis,
+                hypothesize, char, self.kg
+            )
+            logger.info("Step 2 took %.1fs", time.perf_counter() - step_start)
             
             # ── Step 3: Gather evidence for each hypothesis ───────────
-            step_start = time.time()
+            step_start = time.perf_counter()
             evidence = gather_evidence(
-                hypotheses, regression.commit_sha, self.hot_store
+                hypotheses, regression.commit_sha, self.hot_store,
+                shared_evidence=shared_evidence.result()
             )
-            logger.info(f"Step 3 took {time.time()-step_start:.1f}s")
+            logger.info("Step 3 took %.1fs", time.perf_counter() - step_start)
             
             # ── Step 4: Confirm which hypothesis is correct ───────────
-            step_start = time.time()
-            root_cause = confirm_root_cause(hypotheses, evidence)
-            logger.info(f"Step 4 took {time.time()-step_start:.1f}s")
+            step_start = time.perf_counter()
+            root_cause = self._run_step(
+                regression, "confirm", RootCause,
+                confirm_root_cause, hypotheses, evidence
+            )
+            logger.info("Step 4 took %.1fs", time.perf_counter() - step_start)
             
             # ── Step 5: Generate the fix ──────────────────────────────
-            step_start = time.time()
-            fix = generate_fix(root_cause, char)
-            logger.info(f"Step 5 took {time.time()-step_start:.1f}s")
+            step_start = time.perf_counter()
+            fix = self._run_step(
+                regression, "fix", FixPackage,
+                generate_fix, root_cause, char
+            )
+            logger.info("Step 5 took %.1fs", time.perf_counter() - step_start)
             
             # ── Build final report ────────────────────────────────────
-            total_time = time.time() - start_time
+            total_time = time.perf_counter() - start_time
             report = IncidentReport(
                 incident_id=regression.incident_id,
                 regression=regression,
@@ -105,12 +136,21 @@ class AgentOrchestrator:
             )
             
             logger.info(
-                f"\n{'='*60}\n"
-                f"✅ INVESTIGATION COMPLETE in {total_time:.1f}s\n"
-                f"Root cause: {root_cause.confirmed_hypothesis_title}\n"
-                f"Confidence: {root_cause.confidence_score:.0%}\n"
-                f"Fix risk:   {fix.risk_level}\n"
-                f"{'='*60}"
+                "investigation_complete incident=%s duration_sec=%.1f "
+                "root_cause=%r confidence=%.2f risk=%s",
+                regression.incident_id, total_time,
+                root_cause.confirmed_hypothesis_title,
+                root_cause.confidence_score, fix.risk_level
+            )
+            
+            # Verifier resolves this incident row later, so it must exist
+            # before actions run. Also surfaces any error from the write.
+            kg_write.result(timeout=5)
+            
+            # Incident is saved - the cached steps were only for resuming
+            # this investigation, a later one must start from scratch
+            self.step_cache.clear(
+                regression.commit_sha, regression.affected_endpoint
             )
             
             # ── Trigger action layer ──────────────────────────────────
@@ -120,8 +160,35 @@ class AgentOrchestrator:
             return report
             
         except Exception as e:
-            logger.error(f"Investigation failed: {e}", exc_info=True)
+            logger.error("Investigation failed: %s", e, exc_info=True)
             # Notify humans that automated investigation failed
             if self.action_handler:
                 self.action_handler.handle_failure(regression, str(e))
-            raise
\ No newline at end of file
+            raise
+    
+    def _run_step(self, regression: RegressionEvent, step: str, model,
+                  step_fn, *args):
+        """
+        Run one step, or reuse its output from a recent attempt at the
+        same commit + endpoint that failed or is still running.
+        """
+        cached = self.step_cache.get(
+            regression.commit_sha, regression.affected_endpoint, step, model
+        )
+        if cached is not None:
+            logger.info("Reusing cached %s result", step)
+            return cached
+        
+        result = step_fn(*args)
+        self.step_cache.put(
+            regression.commit_sha, regression.affected_endpoint, step, result
+        )
+        return result
+    
+    def _warm_claude(self):
+        """Cheapest authenticated request: no tokens, same host and pool"""
+        try:
+            claude_client.models.list(limit=1)
+            logger.info("Claude connection warmed")
+        except Exception as e:
+            logger.warning("Claude warm-up failed: %s", e)
\ No newline at end of file
@@ -3,8 +3,11 @@
 import json
 import re
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
+_decoder = json.JSONDecoder()
+_FENCE_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)\s*```")
 
 
 def parse_claude_response(raw_response: str, step_name: str) -> dict:
@@ -14,43 +17,44 @@ def parse_claude_response(raw_response: str, step_name: str) -> dict:
     # Log raw response for debugging
     logger.debug(f"[{step_name}] Raw response length: {len(raw_response)}")
 
-    # Clean the response
+    # Clean the response. No copy on the common case: CPython's strip()
+    # returns the same object when there's nothing to strip.
     text = raw_response.strip()
 
-    # Try 1: Direct JSON parse
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
+    # Try 1: Direct JSON parse - the common case, skipped if it can't work
+    if text[:1] in ("{", "["):
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
 
     # Try 2: Extract from ```json ... ``` fences
-    fence_pattern = r"```(?:json)?\s*([\s\S]*?)\s*```"
-    matches = re.findall(fence_pattern, text)
-    for match in matches:
-        try:
-            return json.loads(match.strip())
-        except json.JSONDecodeError:
-            continue
+    if "```" in text:
+        for match in _FENCE_RE.finditer(text):
+            try:
+                return orjson.loads(match.group(1))
+            except orjson.JSONDecodeError:
+                continue
 
     # Try 3: Find outermost { } block
     start = text.find("{")
     end = text.rfind("}")
     if start != -1 and end != -1 and end > start:
         try:
-            return json.loads(text[start:end+1])
-        except json.JSONDecodeError:
+            return orjson.loads(text[start:end+1])
+        except orjson.JSONDecodeError:
             pass
 
-    # Try 4: Fix truncated JSON by finding last complete object
-    # Sometimes Claude response gets cut off
+    # Try 4: Take the first complete object, ignoring whatever follows
+    # Sometimes Claude adds trailing text containing stray braces.
+    # raw_decode finds the longest valid JSON prefix in a single pass.
+    # (orjson has no equivalent, so this one stays on stdlib json.)
     if start != -1:
-        # Try progressively smaller substrings
-        subset = text[start:]
-        for i in range(len(subset), 0, -1):
-            try:
-                return json.loads(subset[:i])
-            except json.JSONDecodeError:
-                continue
+        try:
+            parsed, _ = _decoder.raw_decode(text, start)
+            return parsed
+        except json.JSONDecodeError:
+            pass
 
     # All failed
     logger.error(
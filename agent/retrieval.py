@@ -0,0 +1,61 @@
+# Folder: firetiger-demo/agent/retrieval.py
+#
+# Picks the parts of a source file worth showing Claude.
+# Splits the file into fixed-size line windows and ranks them with
+# BM25 against a query (usually the bad code snippet from step 4).
+#
+# Small enough to not need rank_bm25 as a dependency.
+
+import math
+import re
+from collections import Counter
+from typing import List
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def retrieve_relevant_chunks(file_content: str, query: str,
+                             k: int = 5, window: int = 20) -> str:
+    """
+    Return the k best-matching `window`-line chunks of file_content,
+    in file order so the code still reads top to bottom.
+    """
+    lines = file_content.splitlines()
+    chunks = [
+        "\n".join(lines[i:i + window])
+        for i in range(0, len(lines), window)
+    ]
+    if len(chunks) <= k:
+        return file_content
+
+    docs = [Counter(_tokenize(chunk)) for chunk in chunks]
+    doc_lens = [sum(doc.values()) for doc in docs]
+    avg_len = sum(doc_lens) / len(docs) or 1.0
+
+    # Document frequency of each query term
+    terms = set(_tokenize(query))
+    df = {t: sum(1 for doc in docs if t in doc) for t in terms}
+    n = len(docs)
+
+    scores = []
+    for doc, doc_len in zip(docs, doc_lens):
+        score = 0.0
+        for t in terms:
+            tf = doc.get(t, 0)
+            if not tf:
+                continue
+            idf = math.log((n - df[t] + 0.5) / (df[t] + 0.5) + 1)
+            score += idf * tf * (BM25_K1 + 1) / (
+                tf + BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len)
+            )
+        scores.append(score)
+
+    top = sorted(range(n), key=lambda i: scores[i], reverse=True)[:k]
+    return "\n...\n".join(chunks[i] for i in sorted(top))
@@ -7,12 +7,16 @@
 # Output: Characterization object with all the facts.
 
 import logging
+import random
 from datetime import datetime, timedelta
 from ingestion.event_schema import RegressionEvent, Characterization
 from storage.hot_store import HotStore
 
 logger = logging.getLogger(__name__)
 
+# How many other endpoints to probe for the infra-vs-code check
+ENDPOINT_SAMPLE_SIZE = 32
+
 
 def characterize(regression: RegressionEvent, 
                  hot_store: HotStore) -> Characterization:
@@ -34,19 +38,23 @@ def characterize(regression: RegressionEvent,
     # ─── Check if other endpoints are also affected ───────────────────────
     # If YES: probably infra issue (server overload, DB down)
     # If NO:  probably code issue in this specific endpoint
-    all_endpoints = hot_store.get_all_endpoints()
-    other_endpoints_anomalous = []
+    # A bounded random sample answers this as well as a full scan
+    other_endpoints = [
+        ep for ep in hot_store.get_all_endpoints() if ep != endpoint
+    ]
+    sample = random.sample(
+        other_endpoints, min(len(other_endpoints), ENDPOINT_SAMPLE_SIZE)
+    )
     
-    for ep in all_endpoints:
-        if ep == endpoint:
-            continue
-        other_latency = hot_store.get_recent_latency(ep, minutes=3)
-        other_baseline_latency = hot_store.get_recent_latency(ep, minutes=20)
-        
-        if other_baseline_latency > 0:
-            ratio = other_latency / other_baseline_latency
-            if ratio > 2.0:  # Also 2x slower
-                other_endpoints_anomalous.append(ep)
+    # One grouped query for every endpoint (including this one) instead
+    # of two round trips per endpoint
+    latencies = hot_store.get_latencies_bulk([endpoint, *sample], [3, 20])
+    
+    other_endpoints_anomalous = []
+    for ep in sample:
+        by_window = latencies[ep]
+        if by_window[20] > 0 and by_window[3] / by_window[20] > 2.0:  # Also 2x slower
+            other_endpoints_anomalous.append(ep)
     
     all_endpoints_affected = len(other_endpoints_anomalous) > 0
     
@@ -54,10 +62,10 @@ def characterize(regression: RegressionEvent,
     before_stats = hot_store.get_stats_before_commit(endpoint, commit_sha)
     
     # ─── Get CURRENT stats (since the new commit appeared) ────────────────
-    current_latency = hot_store.get_recent_latency(endpoint, minutes=3)
+    current_latency = latencies.get(endpoint, {}).get(3, 0.0)
     current_trend = hot_store.get_query_count_trend(endpoint)
     current_queries = current_trend[-1]["avg_queries"] if current_trend else 0
-    current_db_time = hot_store.get_recent_latency(endpoint, minutes=3)
+    current_db_time = current_latency
     
     # ─── Find when regression started ─────────────────────────────────────
     # It started when we first saw the new commit SHA
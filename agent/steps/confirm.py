@@ -7,14 +7,15 @@
 # This is where we go from "probably N+1" to "definitely N+1, here's the proof"
 
 import logging
-import anthropic
 from typing import List, Dict
 from ingestion.event_schema import Hypothesis, RootCause
-from agent.response_parser import parse_claude_response
-import config
+from agent.llm_cache import cached_tool_call
+from agent.llm_client import client
 
 logger = logging.getLogger(__name__)
-client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
+
+# Per evidence item, keeps the prompt (and prefill time) bounded
+MAX_EVIDENCE_CHARS = 2048
 
 
 def confirm_root_cause(hypotheses: List[Hypothesis],
@@ -26,26 +27,29 @@ def confirm_root_cause(hypotheses: List[Hypothesis],
     logger.info("[Step 4/5] Confirming root cause...")
     
     # Format hypotheses for the prompt
-    hypotheses_text = ""
-    for hyp in hypotheses:
-        hypotheses_text += f"""
+    hypotheses_text = "".join(
+        f"""
 HYPOTHESIS {hyp.rank} (confidence: {hyp.confidence_score:.0%}):
 Title: {hyp.title}
 Description: {hyp.description}
 Supporting signals: {', '.join(hyp.supporting_signals)}
 """
+        for hyp in hypotheses
+    )
     
-    # Format evidence for each hypothesis
-    evidence_text = ""
-    for rank, evidence in evidence_bundle.items():
-        evidence_text += f"""
+    # Format evidence for each hypothesis, capping each item so one
+    # huge blob can't blow up the prompt
+    evidence_text = "".join(
+        f"""
 ─── EVIDENCE FOR HYPOTHESIS {rank} ───────────────────
 Query Patterns:
 {evidence['query_patterns']}
 
 Specific Evidence:
-{chr(10).join(str(e) for e in evidence['specific_evidence'])}
+{chr(10).join(str(e)[:MAX_EVIDENCE_CHARS] for e in evidence['specific_evidence'])}
 """
+        for rank, evidence in evidence_bundle.items()
+    )
     
     # Get git diff (same for all hypotheses)
     git_diff = evidence_bundle.get(1, {}).get("git_diff", "Not available")
@@ -72,10 +76,9 @@ YOUR TASK
 ═══════════════════════════════════════
 Analyze all evidence and confirm the root cause. Be definitive.
 
-Respond in this exact JSON format only:
+Submit your answer with the submit_root_cause tool, using these values:
 
 {{
-  "confirmed_hypothesis_rank": 1,
   "confirmed_hypothesis_title": "exact title from above",
   "confidence_score": 0.0,
   "evidence_chain": [
@@ -94,15 +97,11 @@ Rules:
 - affected_code_snippet must come verbatim from the git diff shown above
 - if git diff is unclear, lower confidence accordingly"""
 
-    response = client.messages.create(
-        model="claude-opus-4-6",
-        max_tokens=1000,
-        messages=[{"role": "user", "content": prompt}]
+    parsed = cached_tool_call(
+        client, "claude-opus-4-6", prompt, 1000, "confirm_root_cause",
+        "submit_root_cause", RootCause
     )
     
-    raw = response.content[0].text
-    parsed = parse_claude_response(raw, "confirm_root_cause")
-    
     root_cause = RootCause(
         confirmed_hypothesis_title=parsed["confirmed_hypothesis_title"],
         confidence_score=parsed["confidence_score"],
@@ -1,13 +1,16 @@
 # Folder: firetiger-demo/agent/steps/fix.py
 
 import logging
-import anthropic
+import os
 from ingestion.event_schema import RootCause, Characterization, FixPackage
-from agent.response_parser import parse_claude_response
-import config
+from agent.llm_cache import cached_tool_call
+from agent.llm_client import client
+from agent.retrieval import retrieve_relevant_chunks
 
 logger = logging.getLogger(__name__)
-client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
+
+# file_path -> (mtime, content) so unchanged files aren't re-read
+_file_cache = {}
 
 
 def generate_fix(root_cause: RootCause,
@@ -15,7 +18,8 @@ def generate_fix(root_cause: RootCause,
     logger.info("[Step 5/5] Generating fix...")
 
     file_snippet = _read_affected_function(
-        root_cause.affected_code_location
+        root_cause.affected_code_location,
+        root_cause.affected_code_snippet
     )
 
     prompt = f"""You are a senior backend engineer writing a production fix for a Python Flask/SQLite app.
@@ -48,7 +52,7 @@ YOUR TASK:
 Write a minimal fix for THIS specific codebase.
 Generate a clear PR title and description explaining what happened and what you fixed.
 
-Respond with ONLY raw JSON, absolutely no markdown fences, no backticks, no extra text:
+Submit your answer with the submit_fix tool, using these values:
 
 {{
   "fix_summary": "your generated summary here",
@@ -68,22 +72,10 @@ Respond with ONLY raw JSON, absolutely no markdown fences, no backticks, no extr
   "pr_description": "your generated detailed PR description here explaining the incident, root cause, and fix"
 }}"""
 
-    response = client.messages.create(
-        model="claude-opus-4-6",
-        max_tokens=1500,
-        messages=[{"role": "user", "content": prompt}]
+    parsed = cached_tool_call(
+        client, "claude-opus-4-6", prompt, 1500, "generate_fix",
+        "submit_fix", FixPackage
     )
-
-    raw = response.content[0].text.strip()
-
-    # Strip markdown fences if Claude added them despite instructions
-    if raw.startswith("```"):
-        lines = raw.split("\n")
-        raw = "\n".join(lines[1:-1]).strip()
-    if raw.startswith("json"):
-        raw = raw[4:].strip()
-
-    parsed = parse_claude_response(raw, "generate_fix")
     fix = FixPackage(**parsed)
 
     logger.info(
@@ -95,7 +87,7 @@ Respond with ONLY raw JSON, absolutely no markdown fences, no backticks, no extr
     return fix
 
 
-def _read_affected_function(code_location: str) -> str:
+def _read_affected_function(code_location: str, query: str) -> str:
     """Read only the affected function from the file"""
     try:
         file_path = "app/db.py"
@@ -104,16 +96,24 @@ def _read_affected_function(code_location: str) -> str:
                 file_path = part.strip()
                 break
 
-        with open(file_path, "r") as f:
-            content = f.read()
+        # Re-read only when the file changed since last incident
+        mtime = os.stat(file_path).st_mtime
+        cached = _file_cache.get(file_path)
+        if cached and cached[0] == mtime:
+            content = cached[1]
+        else:
+            with open(file_path, "r") as f:
+                content = f.read()
+            _file_cache[file_path] = (mtime, content)
 
         # Extract just the get_checkout_total function
         start = content.find("def get_checkout_total")
         if start != -1:
             return content[start:start+1000]
 
-        return content[:1000]
+        # Otherwise send the chunks that best match the bad code,
+        # not an arbitrary head of the file
+        return retrieve_relevant_chunks(content, query, k=3)
 
     except Exception:
         return "File not available"
-
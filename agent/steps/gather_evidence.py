@@ -6,21 +6,59 @@
 # For each hypothesis, we know what evidence would confirm it.
 # This step goes and gets that evidence programmatically.
 
+import functools
 import logging
 import subprocess
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
 from git import Repo
 from ingestion.event_schema import Hypothesis
 from storage.hot_store import HotStore
 
 logger = logging.getLogger(__name__)
 
+# Enough raw bytes to fill the 3000-char diff cap
+DIFF_READ_BYTES = 4096
+
+# Runs the git diff while the calling thread queries the hot store
+_evidence_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="evidence")
+
+# Query-count bars for every possible width (1 block per 5 queries, max 40)
+_BARS = tuple("█" * i for i in range(41))
+
+
+def gather_shared_evidence(commit_sha: str, hot_store: HotStore) -> dict:
+    """
+    Evidence every hypothesis gets, independent of what they say.
+    The orchestrator starts this early so it overlaps steps 1 and 2.
+    """
+    # ─── Always gather git diff ────────────────────────────────────────────
+    # The git diff is the most important piece of evidence
+    # It shows exactly what changed in the suspect commit
+    # (git subprocess and hot store query run concurrently)
+    git_diff_future = _evidence_pool.submit(get_git_diff, commit_sha)
+    
+    # ─── Always gather slow query patterns ────────────────────────────────
+    # One trend fetch (query counts and latency per minute), reused by
+    # the per-hypothesis query and memory analysis
+    query_trend = hot_store.get_trend("/checkout")
+    query_patterns = get_slow_query_patterns(query_trend)
+    git_diff = git_diff_future.result()
+    
+    return {
+        "git_diff": git_diff,
+        "query_patterns": query_patterns,
+        "query_trend": query_trend
+    }
+
 
 def gather_evidence(hypotheses: List[Hypothesis], 
                     commit_sha: str,
-                    hot_store: HotStore) -> Dict[int, dict]:
+                    hot_store: HotStore,
+                    shared_evidence: Optional[dict] = None) -> Dict[int, dict]:
     """
     For each hypothesis, gather the specific evidence needed to confirm it.
+    shared_evidence is gather_shared_evidence() output if already fetched.
     
     Returns: dict mapping hypothesis rank → evidence bundle
     """
@@ -28,13 +66,15 @@ def gather_evidence(hypotheses: List[Hypothesis],
     
     evidence_bundle = {}
     
-    # ─── Always gather git diff ────────────────────────────────────────────
-    # The git diff is the most important piece of evidence
-    # It shows exactly what changed in the suspect commit
-    git_diff = get_git_diff(commit_sha)
+    if shared_evidence is None:
+        shared_evidence = gather_shared_evidence(commit_sha, hot_store)
+    git_diff = shared_evidence["git_diff"]
+    query_patterns = shared_evidence["query_patterns"]
+    query_trend = shared_evidence["query_trend"]
     
-    # ─── Always gather slow query patterns ────────────────────────────────
-    query_patterns = get_slow_query_patterns(hot_store)
+    # Optional evidence is the same for every hypothesis that asks for
+    # it - compute each piece at most once
+    optional_evidence = {}
     
     # ─── Evidence per hypothesis ──────────────────────────────────────────
     for hyp in hypotheses:
@@ -48,9 +88,13 @@ def gather_evidence(hypotheses: List[Hypothesis],
         evidence_text = " ".join(hyp.evidence_needed).lower()
         
         if "query" in evidence_text or "n+1" in evidence_text or "loop" in evidence_text:
+            if "query" not in optional_evidence:
+                optional_evidence["query"] = analyze_query_patterns(
+                    query_trend, query_patterns
+                )
             evidence["specific_evidence"].append({
                 "type": "query_count_analysis",
-                "data": analyze_query_patterns(hot_store, query_patterns)
+                "data": optional_evidence["query"]
             })
         
         if "index" in evidence_text:
@@ -61,10 +105,11 @@ def gather_evidence(hypotheses: List[Hypothesis],
             })
         
         if "memory" in evidence_text:
-            memory_trend = get_memory_trend(hot_store)
+            if "memory" not in optional_evidence:
+                optional_evidence["memory"] = get_memory_trend(query_trend)
             evidence["specific_evidence"].append({
                 "type": "memory_trend",
-                "data": memory_trend
+                "data": optional_evidence["memory"]
             })
         
         evidence_bundle[hyp.rank] = evidence
@@ -80,44 +125,65 @@ def get_git_diff(commit_sha: str) -> str:
     This shows exactly what code changed.
     """
     try:
-        repo = Repo(".")
-        
-        # Get the diff between this commit and its parent
-        result = subprocess.run(
-            ["git", "diff", f"{commit_sha}~1", commit_sha],
-            capture_output=True,
-            text=True,
-            cwd=repo.working_dir
-        )
-        
-        if result.returncode == 0 and result.stdout:
-            return result.stdout[:3000]  # Cap at 3000 chars for prompt size
-        else:
-            # If only one commit exists, diff against empty tree
-            result = subprocess.run(
-                ["git", "show", commit_sha, "--stat"],
-                capture_output=True, text=True
-            )
-            return result.stdout[:3000]
-            
+        return _read_git_diff(commit_sha)
     except Exception as e:
         logger.warning(f"Could not get git diff: {e}")
         return f"Could not retrieve git diff for {commit_sha}"
 
 
-def get_slow_query_patterns(hot_store: HotStore) -> str:
+@functools.lru_cache(maxsize=128)
+def _read_git_diff(commit_sha: str) -> str:
+    """
+    A commit's diff never changes, so it's read once per SHA.
+    Raises on failure so errors aren't cached.
+    """
+    repo = Repo(".")
+    
+    # Get the diff between this commit and its parent.
+    # Claude only needs the hunks - skip rename/copy detection.
+    # Only the first few KB are ever used, so read just those bytes and
+    # close the pipe - a huge diff is never fully produced or decoded.
+    proc = subprocess.Popen(
+        ["git", "diff", "--no-renames", "--no-color", "-U3",
+         f"{commit_sha}~1", commit_sha],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        cwd=repo.working_dir
+    )
+    data = proc.stdout.read(DIFF_READ_BYTES)
+    proc.stdout.close()
+    try:
+        # git exits (possibly via SIGPIPE) once the pipe is closed
+        proc.wait(timeout=2)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+    
+    if data:
+        # Cap at 3000 chars for prompt size
+        return data.decode("utf-8", errors="replace")[:3000]
+    else:
+        # If only one commit exists, diff against empty tree
+        result = subprocess.run(
+            ["git", "show", commit_sha, "--stat"],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+        return result.stdout[:3000]
+
+
+def get_slow_query_patterns(trend: List[dict]) -> str:
     """
     Summarize DB query patterns from the last 5 minutes.
     Shows the N+1 explosion clearly.
+    trend is hot_store.get_trend() (or get_query_count_trend()) output.
     """
-    trend = hot_store.get_query_count_trend("/checkout")
-    
     if not trend:
         return "No query data available"
     
     lines = ["DB Query Count per Minute (last 30 min):"]
     for point in trend[-10:]:  # Last 10 minutes
-        bar = "█" * min(int(point["avg_queries"] / 5), 40)
+        bar = _BARS[min(int(point["avg_queries"] / 5), 40)]
         lines.append(
             f"  {point['minute'][-5:]} | {bar} {point['avg_queries']:.0f} queries/req"
         )
@@ -125,13 +191,12 @@ def get_slow_query_patterns(hot_store: HotStore) -> str:
     return "\n".join(lines)
 
 
-def analyze_query_patterns(hot_store: HotStore, 
+def analyze_query_patterns(trend: List[dict], 
                            query_patterns: str) -> str:
     """
     Deeper analysis of query behavior.
     Tries to identify if queries are repeating (N+1 signature).
     """
-    trend = hot_store.get_query_count_trend("/checkout")
     if not trend:
         return "Insufficient data"
     
@@ -154,7 +219,9 @@ def analyze_query_patterns(hot_store: HotStore,
     return query_patterns
 
 
-def get_memory_trend(hot_store: HotStore) -> str:
-    """Get memory usage trend - relevant for memory leak hypothesis"""
-    trend = hot_store.get_latency_trend("/checkout")
+def get_memory_trend(trend: List[dict]) -> str:
+    """
+    Get memory usage trend - relevant for memory leak hypothesis.
+    trend is hot_store.get_trend() output.
+    """
     return f"Memory trend data: {len(trend)} data points available"
\ No newline at end of file
@@ -7,15 +7,13 @@
 # Returns 3 ranked hypotheses with confidence scores.
 
 import logging
-import anthropic
 from typing import List
 from ingestion.event_schema import Characterization, Hypothesis
 from storage.knowledge_graph import KnowledgeGraph
-from agent.response_parser import parse_claude_response
-import config
+from agent.llm_cache import cached_messages_create
+from agent.llm_client import client
 
 logger = logging.getLogger(__name__)
-client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
 
 
 def hypothesize(char: Characterization, 
@@ -116,15 +114,10 @@ Rules:
 - evidence_needed must be specific (e.g. "git diff showing loop added" not "check the code")"""
 
     # ─── Call Claude ───────────────────────────────────────────────────────
-    response = client.messages.create(
-        model="claude-opus-4-6",
-        max_tokens=2000,
-        messages=[{"role": "user", "content": prompt}]
+    parsed = cached_messages_create(
+        client, "claude-opus-4-6", prompt, 2000, "hypothesize"
     )
     
-    raw = response.content[0].text
-    parsed = parse_claude_response(raw, "hypothesize")
-    
     # Convert to Hypothesis objects
     hypotheses = [
         Hypothesis(**h) for h in parsed["hypotheses"]
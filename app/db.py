@@ -9,18 +9,67 @@
 
 
 import sqlite3
+import threading
 import time
 import config
 
+class _QueryCounter(threading.local):
+    """
+    [query count, total query time in ns], one pair per thread.
+    The server is threaded and each request runs on its own thread, so
+    overlapping requests no longer reset and add to each other's counts.
+    """
+    def __init__(self):
+        self.values = [0, 0]
+    
+    def __getitem__(self, index):
+        return self.values[index]
+    
+    def __setitem__(self, index, value):
+        self.values[index] = value
+
+
 # This counter is used by middleware to track queries per request
 # Gets reset at start of each request
-query_counter = {"count": 0, "total_time_ms": 0.0}
+# Indexed like a list - ns stay ints until the middleware converts to ms
+query_counter = _QueryCounter()
+
+
+# One connection per request thread, opened once and reused
+_tls = threading.local()
+
+# Statement cache size per connection. SQL lives in module-level
+# constants so every call hits the same cached prepared statement -
+# the cache only resets when the process restarts.
+CACHED_STATEMENTS = 256
+
+_SQL_CART_ITEMS = "SELECT * FROM cart_items WHERE cart_id = ?"
+_SQL_PRODUCT = "SELECT * FROM products WHERE id = ?"
+_SQL_SELLER_TAX = "SELECT tax_rate FROM sellers WHERE id = ?"
+_SQL_CHECKOUT = (
+    "SELECT COALESCE(SUM(p.price * ci.quantity * (1 + s.tax_rate)), 0), "
+    "COUNT(*) "
+    "FROM cart_items ci "
+    "JOIN products p ON ci.product_id = p.id "
+    "JOIN sellers s ON p.seller_id = s.id "
+    "WHERE ci.cart_id = ?"
+)
 
 
 def get_connection():
     """Get SQLite connection with row factory for dict-like access"""
-    conn = sqlite3.connect(config.DB_PATH)
-    conn.row_factory = sqlite3.Row
+    conn = getattr(_tls, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(config.DB_PATH, check_same_thread=False,
+                               cached_statements=CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            PRAGMA temp_store = MEMORY;
+            PRAGMA cache_size = -8000;
+        """)
+        _tls.conn = conn
     return conn
 
 
@@ -30,13 +79,12 @@ def track_query(func):
     Applied to every DB function so middleware can count automatically.
     """
     def wrapper(*args, **kwargs):
-        start = time.time()
+        start = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        elapsed = (time.time() - start) * 1000
         
         # Increment global counter - middleware reads this after request
-        query_counter["count"] += 1
-        query_counter["total_time_ms"] += elapsed
+        query_counter[0] += 1
+        query_counter[1] += time.perf_counter_ns() - start
         
         return result
     return wrapper
@@ -44,20 +92,15 @@ def track_query(func):
 
 @track_query
 def fetch_cart_items(conn, cart_id):
-    return conn.execute(
-        "SELECT * FROM cart_items WHERE cart_id = ?", 
-        (cart_id,)
-    ).fetchall()
+    return conn.execute(_SQL_CART_ITEMS, (cart_id,)).fetchall()
 
 
 @track_query
 def fetch_product(conn, product_id):
     """Called once per cart item in slow version = N+1"""
-    time.sleep(0.01)
-    return conn.execute(
-        "SELECT * FROM products WHERE id = ?", 
-        (product_id,)
-    ).fetchone()
+    if config.SIMULATE_SLOW_PRODUCT:
+        time.sleep(0.01)
+    return conn.execute(_SQL_PRODUCT, (product_id,)).fetchone()
 
 
 @track_query
@@ -66,18 +109,9 @@ def fetch_checkout_fast(conn, cart_id):
     FAST VERSION: Single JOIN query
     This is how checkout should work.
     1 query regardless of how many items in cart.
+    SQLite does the math too - returns one (total, item_count) row.
     """
-    return conn.execute("""
-        SELECT 
-            ci.quantity,
-            p.price,
-            p.name,
-            s.tax_rate
-        FROM cart_items ci
-        JOIN products p ON ci.product_id = p.id
-        JOIN sellers s ON p.seller_id = s.id
-        WHERE ci.cart_id = ?
-    """, (cart_id,)).fetchall()
+    return conn.execute(_SQL_CHECKOUT, (cart_id,)).fetchone()
 
 
 def get_checkout_total(cart_id: int) -> dict:
@@ -110,10 +144,9 @@ def get_checkout_total(cart_id: int) -> dict:
             if product:
                 # Another query to get seller tax rate
                 seller = conn.execute(
-                    "SELECT tax_rate FROM sellers WHERE id = ?",
-                    (product["seller_id"],)
+                    _SQL_SELLER_TAX, (product["seller_id"],)
                 ).fetchone()
-                query_counter["count"] += 1
+                query_counter[0] += 1
                 
                 price = product["price"] * item["quantity"]
                 tax = price * (seller["tax_rate"] if seller else 0.08)
@@ -124,15 +157,7 @@ def get_checkout_total(cart_id: int) -> dict:
         # FAST VERSION - Single JOIN Query
         # ===================================================
         # Everything in one query regardless of cart size
-        rows = fetch_checkout_fast(conn, cart_id)
-        
-        for row in rows:
-            price = row["price"] * row["quantity"]
-            tax = price * row["tax_rate"]
-            total += price + tax
-            item_count += 1
-
-    conn.close()
+        total, item_count = fetch_checkout_fast(conn, cart_id)
     
     return {
         "total": round(total, 2),
@@ -1,15 +1,15 @@
 # app/middleware.py - Simplified version with no blocking calls
 
 import threading
+import queue
 import logging
 import time
-import uuid
+import os
+import itertools
 import http.client
-import json
-import subprocess
+import orjson
 from flask import request, g
 from datetime import datetime
-from ingestion.event_schema import EventSchema
 import config
 
 logger = logging.getLogger(__name__)
@@ -17,19 +17,69 @@ logger = logging.getLogger(__name__)
 # Cache commit SHA - only read git once
 _commit_sha = None
 
+# Collector connection per sending thread, kept open between batches
+_tls = threading.local()
+
+# Events wait here for the sender thread, which posts them in batches
+EVENT_QUEUE_SIZE = 10000
+MAX_BATCH_SIZE = 64
+_event_q = queue.Queue(maxsize=EVENT_QUEUE_SIZE)
+
+# (epoch second, its ISO prefix) for cheap event timestamps
+_ts_cache = (0, "")
+
+# Anonymous requests get unique ids without a urandom read each:
+# random per-process prefix + counter
+_anon_prefix = os.urandom(8).hex()
+_anon_counter = itertools.count()
+
+# Same length `git rev-parse --short` gives, so SHAs stay comparable
+SHORT_SHA_LEN = 7
+
+
 def get_commit_sha():
     global _commit_sha
     if _commit_sha is None:
         try:
-            result = subprocess.run(
-                ["git", "rev-parse", "--short", "HEAD"],
-                capture_output=True, text=True, timeout=2
-            )
-            _commit_sha = result.stdout.strip() or "unknown"
+            _commit_sha = _read_head_sha()[:SHORT_SHA_LEN] or "unknown"
         except Exception:
             _commit_sha = "unknown"
     return _commit_sha
 
+def _read_head_sha() -> str:
+    """Resolve HEAD from .git directly - no git subprocess fork/exec"""
+    with open(".git/HEAD") as f:
+        head = f.read().strip()
+    if not head.startswith("ref: "):
+        return head  # detached HEAD holds the SHA itself
+
+    ref = head[len("ref: "):]
+    try:
+        with open(f".git/{ref}") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        # Ref was packed by git gc
+        with open(".git/packed-refs") as f:
+            for line in f:
+                if line.rstrip().endswith(f" {ref}"):
+                    return line.split(" ", 1)[0]
+    return ""
+
+def _now_iso() -> str:
+    """datetime.now().isoformat(), formatting the date part once per second"""
+    global _ts_cache
+    now = time.time()
+    sec = int(now)
+    cached_sec, prefix = _ts_cache
+    if sec != cached_sec:
+        prefix = datetime.fromtimestamp(sec).isoformat()
+        # One tuple, so threads never see a second paired with another's prefix
+        _ts_cache = (sec, prefix)
+    return f"{prefix}.{int((now - sec) * 1e6):06d}"
+
+def _anon_user_id() -> str:
+    return f"{_anon_prefix}-{next(_anon_counter)}"
+
 def clear_commit_cache():
     global _commit_sha
     _commit_sha = None
@@ -40,8 +90,8 @@ def register_middleware(app):
     def before_request():
         g.start_time = time.time()
         from app.db import query_counter
-        query_counter["count"] = 0
-        query_counter["total_time_ms"] = 0.0
+        query_counter[0] = 0
+        query_counter[1] = 0
 
     @app.after_request
     def after_request(response):
@@ -50,26 +100,26 @@ def register_middleware(app):
             from app.db import query_counter
 
             event = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _now_iso(),
                 "endpoint": request.path,
                 "method": request.method,
                 "status_code": response.status_code,
                 "latency_ms": round(latency_ms, 2),
-                "db_query_count": query_counter["count"],
-                "db_query_time_ms": round(query_counter["total_time_ms"], 2),
-                "user_id": request.headers.get("X-User-ID", str(uuid.uuid4())),
+                "db_query_count": query_counter[0],
+                "db_query_time_ms": round(query_counter[1] / 1e6, 2),
+                "user_id": request.headers.get("X-User-ID") or _anon_user_id(),
                 "session_id": request.headers.get("X-Session-ID", "default"),
                 "memory_mb": 0.0,
                 "commit_sha": get_commit_sha(),
                 "error_message": None
             }
 
-            # Fire and forget in background thread
-            threading.Thread(
-                target=_send,
-                args=(event,),
-                daemon=True
-            ).start()
+            # Fire and forget - the sender thread batches it.
+            # If the collector is that far behind, drop the event.
+            _event_q.put_nowait(event)
+
+        except queue.Full:
+            pass
 
         except Exception as e:
             logger.error(f"Middleware error: {e}")
@@ -77,22 +127,45 @@ def register_middleware(app):
         return response
 
 
-def _send(event_data: dict):
-    """Non-blocking send using raw http.client"""
+def _drain_loop():
+    """Sender thread: block for one event, then take whatever else is queued"""
+    while True:
+        batch = [_event_q.get()]
+        try:
+            while len(batch) < MAX_BATCH_SIZE:
+                batch.append(_event_q.get_nowait())
+        except queue.Empty:
+            pass
+        _send(batch)
+
+
+def _send(events: list):
+    """Post a batch of events over a reused keep-alive connection"""
+    conn = getattr(_tls, "conn", None)
     try:
-        body = json.dumps(event_data, default=str)
-        conn = http.client.HTTPConnection(
-            "127.0.0.1",
-            config.COLLECTOR_PORT,
-            timeout=1
-        )
+        body = orjson.dumps(events, default=str)  # bytes, sent as-is
+        if conn is None:
+            conn = http.client.HTTPConnection(
+                "127.0.0.1",
+                config.COLLECTOR_PORT,
+                timeout=1
+            )
         conn.request(
             "POST",
             "/ingest",
             body=body,
-            headers={"Content-Type": "application/json"}
+            headers={
+                "Content-Type": "application/json",
+                "Connection": "keep-alive"
+            }
         )
-        conn.getresponse()
-        conn.close()
+        # Response must be fully read before the connection can be reused
+        conn.getresponse().read()
+        _tls.conn = conn
     except Exception:
-        pass
\ No newline at end of file
+        if conn is not None:
+            conn.close()
+        _tls.conn = None
+
+
+threading.Thread(target=_drain_loop, daemon=True).start()
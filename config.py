@@ -18,18 +18,25 @@ SLACK_CHANNEL_ID = os.getenv("SLACK_CHANNEL_ID")
 APP_PORT = int(os.getenv("APP_PORT", 5000))
 COLLECTOR_PORT = int(os.getenv("COLLECTOR_PORT", 8001))
 USE_SLOW_QUERY = os.getenv("USE_SLOW_QUERY", "false").lower() == "true"
+# Per-product 10ms sleep that makes the N+1 path visibly slow in the demo.
+# Turn off to benchmark the real SQL cost of /checkout.
+SIMULATE_SLOW_PRODUCT = os.getenv("SIMULATE_SLOW_PRODUCT", "true").lower() == "true"
 
 # Detection thresholds
 ANOMALY_THRESHOLD = 3.0        # standard deviations from baseline
 CONSECUTIVE_STRIKES = 3        # how many anomalous readings before firing
 DETECTION_INTERVAL_SEC = 10    # how often detector checks
+MAX_CONCURRENT_INVESTIGATIONS = 2  # agent runs in flight at once
 
 # Agent settings
 AUTO_MERGE_CONFIDENCE = 0.92   # minimum confidence to auto-merge
 HOT_STORE_WINDOW_MIN = 30      # how many minutes to keep in hot store
+STEP_CACHE_TTL_SEC = 300       # how long a failed investigation can resume from its steps
 
 # Data paths
 DATA_DIR = "data/events"
 DB_PATH = "store.db"
 METRICS_DB_PATH = "metrics.db"
-KNOWLEDGE_DB_PATH = "knowledge.db"
\ No newline at end of file
+KNOWLEDGE_DB_PATH = "knowledge.db"
+LLM_CACHE_DB_PATH = "llm_cache.db"
+STEP_CACHE_DB_PATH = "step_cache.db"
\ No newline at end of file
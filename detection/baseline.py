@@ -5,14 +5,37 @@
 # Baselines are time-aware: 2pm Tuesday has different normal than 2am Sunday.
 
 import logging
-import statistics
+import time
+import numpy as np
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
 from storage.cold_store import ColdStore
 from storage.knowledge_graph import KnowledgeGraph
 
 logger = logging.getLogger(__name__)
 
+MS_PER_HOUR = 3_600_000
+MS_PER_DAY = 86_400_000
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday
+
+# (epoch second the current hour ends, hour, weekday) - the detector
+# asks for the slot every tick, and it only changes on the hour
+_current_slot = (0.0, 0, 0)
+
+
+def current_slot() -> Tuple[int, int]:
+    """(hour, day_of_week) right now, like datetime.now().hour/.weekday()"""
+    global _current_slot
+    expires, hour, day = _current_slot
+    now = time.time()
+    if now >= expires:
+        dt = datetime.fromtimestamp(now)
+        hour, day = dt.hour, dt.weekday()
+        hour_start = dt.replace(minute=0, second=0, microsecond=0)
+        # One tuple, so threads never see an hour paired with another's day
+        _current_slot = (hour_start.timestamp() + 3600, hour, day)
+    return hour, day
+
 
 class BaselineEngine:
     """
@@ -26,6 +49,8 @@ class BaselineEngine:
     def __init__(self, cold_store: ColdStore, knowledge_graph: KnowledgeGraph):
         self.cold_store = cold_store
         self.kg = knowledge_graph
+        # {endpoint: (kg.baseline_version, {(hour, day_of_week): baseline})}
+        self._slot_cache = {}
     
     def compute_baseline(self, endpoint: str):
         """
@@ -36,51 +61,69 @@ class BaselineEngine:
         """
         logger.info(f"Computing baseline for {endpoint}")
         
-        # Read 7 days of historical events
-        historical = self.cold_store.read_historical(endpoint, hours_back=168)
+        # Read 7 days of historical events - only the columns we need
+        historical = self.cold_store.read_historical(
+            endpoint, hours_back=168,
+            columns=["timestamp", "latency_ms", "db_query_count"]
+        )
         
-        if len(historical) < 50:
+        if historical.num_rows < 50:
             logger.warning(
                 f"Not enough historical data for {endpoint} "
-                f"({len(historical)} events). Using defaults."
+                f"({historical.num_rows} events). Using defaults."
             )
             self._set_default_baseline(endpoint)
             return
         
-        # Group by hour and day of week
-        groups = {}
-        for event in historical:
-            ts = datetime.fromisoformat(str(event["timestamp"]))
-            key = (ts.hour, ts.weekday())
-            
-            if key not in groups:
-                groups[key] = {"latencies": [], "query_counts": []}
-            
-            groups[key]["latencies"].append(event["latency_ms"])
-            groups[key]["query_counts"].append(event["db_query_count"])
+        # Time slot per event, straight from the epoch milliseconds.
+        # slot = hour * 7 + day_of_week (Monday = 0, like weekday())
+        epoch_ms = historical.column("timestamp").to_numpy().astype(np.int64)
+        hours = (epoch_ms // MS_PER_HOUR) % 24
+        days = (epoch_ms // MS_PER_DAY + EPOCH_WEEKDAY) % 7
+        slots = (hours * 7 + days).astype(np.uint8)
+        latencies = historical.column("latency_ms").to_numpy()
+        query_counts = historical.column("db_query_count").to_numpy()
+        
+        # Group by slot: each slot becomes a contiguous run. A stable sort
+        # on 8-bit keys is a linear-time radix sort in numpy.
+        order = np.argsort(slots, kind="stable")
+        slots = slots[order]
+        latencies = latencies[order]
+        query_counts = query_counts[order].astype(np.float64)
         
-        # Compute stats for each time slot
-        for (hour, day), data in groups.items():
-            if len(data["latencies"]) < 5:
+        slot_ids, starts, counts = np.unique(
+            slots, return_index=True, return_counts=True
+        )
+        latency_sums = np.add.reduceat(latencies, starts)
+        query_sums = np.add.reduceat(query_counts, starts)
+        
+        # Compute stats for each time slot, written back in one go
+        baselines = {}
+        for slot, start, count, latency_sum, query_sum in zip(
+            slot_ids, starts, counts, latency_sums, query_sums
+        ):
+            if count < 5:
                 continue
             
-            latencies = sorted(data["latencies"])
-            p95_index = int(len(latencies) * 0.95)
+            hour, day = divmod(int(slot), 7)
             
-            self.kg.update_baseline(
-                endpoint=endpoint,
-                hour=hour,
-                day_of_week=day,
-                metrics={
-                    "avg_latency_ms": statistics.mean(latencies),
-                    "p95_latency_ms": latencies[p95_index],
-                    "avg_query_count": statistics.mean(data["query_counts"]),
-                    "sample_size": len(latencies)
-                }
-            )
+            # p95 is one order statistic - quickselect it, no full sort
+            p95_rank = int(count * 0.95)
+            p95_latency = np.partition(
+                latencies[start:start + count], p95_rank
+            )[p95_rank]
+            
+            baselines[(hour, day)] = {
+                "avg_latency_ms": float(latency_sum / count),
+                "p95_latency_ms": float(p95_latency),
+                "avg_query_count": float(query_sum / count),
+                "sample_size": int(count)
+            }
+        
+        self.kg.update_baselines(endpoint, baselines)
         
         logger.info(f"Baseline updated for {endpoint}: "
-                   f"{len(groups)} time slots")
+                   f"{len(slot_ids)} time slots")
     
     def get_current_baseline(self, endpoint: str) -> dict:
         """
@@ -88,12 +131,7 @@ class BaselineEngine:
         Looks up by current hour and day of week.
         Falls back to a simple default if no baseline exists.
         """
-        now = datetime.now()
-        baseline = self.kg.get_baseline(
-            endpoint=endpoint,
-            hour=now.hour,
-            day_of_week=now.weekday()
-        )
+        baseline = self._slots(endpoint).get(current_slot())
         
         if baseline:
             return baseline
@@ -107,6 +145,23 @@ class BaselineEngine:
             "sample_size": 0
         }
     
+    def _slots(self, endpoint: str) -> dict:
+        """
+        Every (hour, day_of_week) baseline for an endpoint, read from the
+        knowledge graph once and kept until a baseline is written again.
+        The detector asks every tick; baselines change hourly.
+        """
+        version = self.kg.baseline_version
+        cached = self._slot_cache.get(endpoint)
+        if cached is None or cached[0] != version:
+            slots = {
+                (row["hour_of_day"], row["day_of_week"]): row
+                for row in self.kg.get_baselines(endpoint)
+            }
+            cached = (version, slots)
+            self._slot_cache[endpoint] = cached
+        return cached[1]
+    
     def _set_default_baseline(self, endpoint: str):
         """Set reasonable defaults when no historical data exists"""
         now = datetime.now()
@@ -11,6 +11,7 @@
 import time
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Callable
 from storage.hot_store import HotStore
@@ -47,6 +48,17 @@ class Detector:
         # This will be agent_orchestrator.investigate()
         self.on_regression = on_regression
         
+        # Investigations run on a fixed pool instead of a thread each.
+        # The semaphore caps how many can be in flight - past that,
+        # a regression is dropped and re-detected on later strikes.
+        self._investigation_pool = ThreadPoolExecutor(
+            max_workers=config.MAX_CONCURRENT_INVESTIGATIONS,
+            thread_name_prefix="investigator"
+        )
+        self._investigation_slots = threading.BoundedSemaphore(
+            config.MAX_CONCURRENT_INVESTIGATIONS
+        )
+        
         # Track consecutive anomalous readings per endpoint
         # Format: {endpoint: strike_count}
         self.strikes: Dict[str, int] = {}
@@ -83,29 +95,30 @@ class Detector:
         """
         while self.running:
             try:
-                endpoints = self.hot_store.get_all_endpoints()
+                # Current metrics for every endpoint in one round trip
+                # (last 3 minutes average)
+                metrics = self.hot_store.get_current_metrics(minutes=3)
                 
-                for endpoint in endpoints:
+                for endpoint, current in metrics.items():
                     # Skip endpoints currently being investigated
                     if endpoint in self.active_incidents:
                         continue
                     
-                    self._check_endpoint(endpoint)
+                    self._check_endpoint(
+                        endpoint, current["latency"], current["queries"]
+                    )
                     
             except Exception as e:
                 logger.error(f"Detection loop error: {e}")
             
             time.sleep(config.DETECTION_INTERVAL_SEC)
     
-    def _check_endpoint(self, endpoint: str):
+    def _check_endpoint(self, endpoint: str, current_latency: float,
+                        current_queries: float):
         """
         Check one endpoint for anomalies.
         Implements the 3-strikes rule.
         """
-        # Get current metrics (last 3 minutes average)
-        current_latency = self.hot_store.get_recent_latency(endpoint, minutes=3)
-        current_queries = self._get_current_query_avg(endpoint, minutes=3)
-        
         if current_latency == 0:
             return  # No data yet
         
@@ -173,7 +186,8 @@ class Detector:
         affected_users = self.hot_store.get_affected_users(
             endpoint=endpoint,
             since=datetime.now() - timedelta(minutes=5),
-            latency_threshold_ms=latency_before * 2
+            latency_threshold_ms=latency_before * 2,
+            limit=50  # cap at 50 for prompt size
         )
         
         # Get the suspect commit
@@ -189,24 +203,26 @@ class Detector:
             query_count_before=queries_before,
             query_count_after=queries_after,
             commit_sha=commit_sha,
-            affected_user_ids=affected_users[:50]  # cap at 50 for prompt size
+            affected_user_ids=affected_users
         )
         
-        # Fire callback in a separate thread so detector keeps running
-        thread = threading.Thread(
-            target=self.on_regression,
-            args=(regression,),
-            daemon=True
-        )
-        thread.start()
+        # Hand off to the investigation pool so detector keeps running
+        if not self._investigation_slots.acquire(blocking=False):
+            logger.warning(
+                f"Investigations saturated, dropping regression on {endpoint}"
+            )
+            self.active_incidents.discard(endpoint)
+            return
+        
+        future = self._investigation_pool.submit(self.on_regression, regression)
+        future.add_done_callback(self._investigation_done)
     
-    def _get_current_query_avg(self, endpoint: str, minutes: int) -> float:
-        """Get average DB query count per request for last N minutes"""
-        trend = self.hot_store.get_query_count_trend(endpoint)
-        if not trend:
-            return 0.0
-        recent = trend[-minutes:] if len(trend) >= minutes else trend
-        return sum(r["avg_queries"] for r in recent) / len(recent)
+    def _investigation_done(self, future):
+        """Free the slot, and log anything the investigation raised"""
+        self._investigation_slots.release()
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Investigation failed: {error}")
     
     def _compute_anomaly_score(self, current: float, baseline: float) -> float:
         """
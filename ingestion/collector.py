@@ -11,6 +11,8 @@
 # - Mirrors real-world collector architecture (Datadog agent, etc.)
 
 from flask import Flask, request, jsonify
+from typing import List
+from pydantic import TypeAdapter
 from ingestion.event_schema import EventSchema
 from storage.hot_store import HotStore
 from storage.cold_store import ColdStore
@@ -32,17 +34,33 @@ app = Flask(__name__)
 hot_store = HotStore()
 cold_store = ColdStore()
 
+# Refill the hot window from what was already flushed, so a restarted
+# collector doesn't leave the detector blind for 30 minutes
+hot_store.bulk_load_from_cold(
+    cold_store.recent_files(config.HOT_STORE_WINDOW_MIN // 60 + 2),
+    config.HOT_STORE_WINDOW_MIN
+)
+
 # Buffer events here before flushing to cold store
 # Flushed every 5 minutes
 _flush_buffer = []
 _buffer_lock = threading.Lock()
 
+# Built once - validates a whole batch from the middleware in one call
+_batch_adapter = TypeAdapter(List[EventSchema])
+
+# Deploy log stays open for the collector's lifetime. Line buffered,
+# so each record still reaches the file as soon as it's written.
+_deploy_log = open("deploys.log", "a", buffering=1)
+_deploy_log_lock = threading.Lock()
+
 
 @app.route("/ingest", methods=["POST"])
 def ingest():
     """
     Main ingestion endpoint.
-    Receives one EventSchema per request from the main app.
+    Receives one EventSchema, or a batch of them as a JSON array,
+    per request from the main app.
     
     Flow:
     1. Validate incoming JSON as EventSchema
@@ -50,19 +68,25 @@ def ingest():
     3. Add to flush buffer (for cold store write later)
     """
     try:
-        # Validate the incoming event matches our schema
-        data = request.get_json()
-        event = EventSchema(**data)
+        # Validate the incoming events match our schema - pydantic parses
+        # and validates the raw body in one pass, no json.loads first
+        body = request.get_data(cache=False)
+        if body.lstrip()[:1] == b"[":
+            events = _batch_adapter.validate_json(body)
+        else:
+            events = [EventSchema.model_validate_json(body)]
         
         # Write to hot store immediately - detector reads this
-        hot_store.insert(event)
+        batch = hot_store.insert_many(events)
         
-        # Add to buffer for cold store flush
+        # Add to buffer for cold store flush - the columnar batch the hot
+        # store already built, so the flush needn't rebuild it
         with _buffer_lock:
-            _flush_buffer.append(event)
+            _flush_buffer.append(batch)
         
-        logger.info(f"{event.endpoint} | {event.latency_ms}ms | "
-                   f"{event.db_query_count} queries | {event.commit_sha}")
+        for event in events:
+            logger.info(f"{event.endpoint} | {event.latency_ms}ms | "
+                       f"{event.db_query_count} queries | {event.commit_sha}")
         
         return jsonify({"status": "ok"}), 200
         
@@ -82,8 +106,8 @@ def deploy_notification():
     logger.info(f"🚀 New deploy: {commit_sha}")
     
     # Log to a deploys file for the agent to read
-    with open("deploys.log", "a") as f:
-        f.write(f"{time.time()},{commit_sha}\n")
+    with _deploy_log_lock:
+        _deploy_log.write(f"{time.time()},{commit_sha}\n")
     
     return jsonify({"status": "ok"}), 200
 
@@ -93,7 +117,7 @@ def health():
     return jsonify({
         "status": "ok",
         "hot_store_events": hot_store.get_event_count(),
-        "buffer_size": len(_flush_buffer)
+        "buffer_size": sum(batch.num_rows for batch in _flush_buffer)
     })
 
 
@@ -105,15 +129,21 @@ def flush_to_cold_store():
     """
     global _flush_buffer
     
+    # Swap in a fresh list - O(1) under the lock, so ingest never waits
+    # on a copy. Ingest only touches the buffer through the global name.
     with _buffer_lock:
         if not _flush_buffer:
             return
         
-        to_flush = _flush_buffer.copy()
-        _flush_buffer = []
+        to_flush, _flush_buffer = _flush_buffer, []
     
-    cold_store.flush(to_flush)
-    logger.info(f"Flushed {len(to_flush)} events to cold store")
+    cold_store.flush_batches(to_flush)
+    logger.info(f"Flushed {sum(b.num_rows for b in to_flush)} events to cold store")
+
+
+def compact_cold_store():
+    """Runs hourly. Merges each finished hour's flush files into one."""
+    cold_store.compact_closed_partitions()
 
 
 def purge_hot_store():
@@ -125,10 +155,12 @@ def run_scheduler():
     """Background thread running scheduled tasks"""
     schedule.every(5).minutes.do(flush_to_cold_store)
     schedule.every(5).minutes.do(purge_hot_store)
+    schedule.every(1).hours.do(compact_cold_store)
     
     while True:
         schedule.run_pending()
-        time.sleep(10)
+        # Sleep until the next job is due instead of polling
+        time.sleep(max(schedule.idle_seconds(), 0))
 
 
 # Start scheduler in background thread when collector starts
@@ -141,6 +173,13 @@ def query_latency():
     result = hot_store.get_recent_latency(endpoint, minutes)
     return jsonify({"latency": result})
 
+@app.route("/query/latencies", methods=["GET"])
+def query_latencies():
+    endpoints = request.args.getlist("endpoint")
+    windows = [int(m) for m in request.args.getlist("minutes")]
+    result = hot_store.get_latencies_bulk(endpoints, windows)
+    return jsonify({"latencies": result})
+
 @app.route("/query/endpoints", methods=["GET"])
 def query_endpoints():
     result = hot_store.get_all_endpoints()
@@ -152,14 +191,27 @@ def query_trend():
     result = hot_store.get_query_count_trend(endpoint)
     return jsonify({"trend": result})
 
+@app.route("/query/trend", methods=["GET"])
+def trend():
+    endpoint = request.args.get("endpoint", "/checkout")
+    result = hot_store.get_trend(endpoint)
+    return jsonify({"trend": result})
+
+@app.route("/query/current_metrics", methods=["GET"])
+def query_current_metrics():
+    minutes = int(request.args.get("minutes", 3))
+    result = hot_store.get_current_metrics(minutes)
+    return jsonify({"metrics": result})
+
 @app.route("/query/affected_users", methods=["GET"])
 def query_affected_users():
     endpoint = request.args.get("endpoint", "/checkout")
     threshold = float(request.args.get("threshold", 100))
+    limit = request.args.get("limit", type=int)
     since_str = request.args.get("since")
     from datetime import datetime, timedelta
     since = datetime.fromisoformat(since_str) if since_str else datetime.now() - timedelta(minutes=10)
-    result = hot_store.get_affected_users(endpoint, since, threshold)
+    result = hot_store.get_affected_users(endpoint, since, threshold, limit)
     return jsonify({"user_ids": result})
 
 @app.route("/query/commit_shas", methods=["GET"])
@@ -90,19 +90,28 @@ def main():
     def recompute_baselines():
         """Recompute baselines hourly as more data accumulates"""
         from detection.baseline import BaselineEngine
+        from concurrent.futures import ThreadPoolExecutor
         engine = BaselineEngine(cold_store, knowledge_graph)
-        for endpoint in ["/checkout", "/products", "/health"]:
+        endpoints = ["/checkout", "/products", "/health"]
+        
+        def compute(endpoint):
             try:
                 engine.compute_baseline(endpoint)
             except Exception as e:
                 logger.warning(f"Baseline computation failed for {endpoint}: {e}")
+        
+        # Endpoints are independent, and the Parquet scan and numpy
+        # grouping release the GIL - compute them side by side
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+            list(pool.map(compute, endpoints))
     
     schedule.every(1).hours.do(recompute_baselines)
     
     def run_scheduler():
         while True:
             schedule.run_pending()
-            time.sleep(30)
+            # Sleep until the next job is due instead of polling
+            time.sleep(max(schedule.idle_seconds(), 0))
     
     threading.Thread(target=run_scheduler, daemon=True).start()
     
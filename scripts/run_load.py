@@ -7,13 +7,28 @@ import requests
 import time
 import random
 import uuid
-import statistics
+import numpy as np
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+# One keep-alive connection pool for every request, instead of a
+# new TCP connection per call
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=20, pool_maxsize=50))
+
+# A batch's requests go out together, like concurrent real users
+POOL = ThreadPoolExecutor(max_workers=16)
 
 # 50 fake user IDs that make requests repeatedly
 USER_POOL = [str(uuid.uuid4()) for _ in range(50)]
 
 # Track latencies for reporting
-latency_history = {"checkout": [], "products": [], "health": []}
+# Fixed-size rings - the last 100 readings per endpoint
+latency_history = {
+    key: deque(maxlen=100) for key in ("checkout", "products", "health")
+}
 request_count = 0
 start_time = time.time()
 
@@ -22,7 +37,7 @@ def make_request(endpoint: str, user_id: str):
     """Make one request and return latency"""
     try:
         start = time.time()
-        response = requests.get(
+        response = SESSION.get(
             f"http://127.0.0.1:5000{endpoint}",
             headers={
                 "X-User-ID": user_id,
@@ -47,8 +62,12 @@ def print_stats():
     
     for endpoint, latencies in latency_history.items():
         if latencies:
-            recent = latencies[-20:]  # Last 20 readings
-            avg = statistics.mean(recent)
+            recent = np.fromiter(
+                islice(latencies, max(0, len(latencies) - 20), None),  # Last 20 readings
+                dtype=np.float64
+            )
+            avg = recent.mean()
+            p95 = np.percentile(recent, 95)
             
             # Visual indicator
             if avg < 50:
@@ -58,7 +77,8 @@ def print_stats():
             else:
                 indicator = "🚨"
             
-            print(f"{indicator} /{endpoint}: {avg:.1f}ms avg (last 20 requests)")
+            print(f"{indicator} /{endpoint}: {avg:.1f}ms avg, "
+                  f"{p95:.1f}ms p95 (last 20 requests)")
     
     print(f"{'─'*50}")
 
@@ -74,16 +94,18 @@ while True:
         ("/health", 1),      # 1 health check
     ]
     
-    for endpoint, count in endpoints_this_batch:
-        for _ in range(count):
-            latency, status = make_request(endpoint, user_id)
-            if latency:
-                key = endpoint.strip("/")
-                latency_history[key].append(latency)
-                # Keep last 100 readings per endpoint
-                if len(latency_history[key]) > 100:
-                    latency_history[key] = latency_history[key][-100:]
-                request_count += 1
+    batch = [
+        endpoint
+        for endpoint, count in endpoints_this_batch
+        for _ in range(count)
+    ]
+    results = POOL.map(lambda endpoint: make_request(endpoint, user_id), batch)
+    
+    for endpoint, (latency, status) in zip(batch, results):
+        if latency:
+            key = endpoint.strip("/")
+            latency_history[key].append(latency)
+            request_count += 1
     
     # Print stats every 30 seconds
     batch_counter += 1
@@ -11,9 +11,13 @@ def seed():
     conn = sqlite3.connect(config.DB_PATH)
     
     conn.executescript("""
-        DROP TABLE IF EXISTS sellers;
-        DROP TABLE IF EXISTS products;
+        PRAGMA journal_mode = WAL;
+        PRAGMA synchronous = NORMAL;
+        
+        -- Dependents first, so the drops hold up with foreign_keys=ON
         DROP TABLE IF EXISTS cart_items;
+        DROP TABLE IF EXISTS products;
+        DROP TABLE IF EXISTS sellers;
         
         CREATE TABLE sellers (
             id INTEGER PRIMARY KEY,
@@ -38,27 +42,29 @@ def seed():
         );
     """)
     
+    # One executemany per table - the inserts all land in the one
+    # transaction committed below
+    
     # 20 sellers
-    for i in range(1, 21):
-        conn.execute(
-            "INSERT INTO sellers VALUES (?, ?, ?)",
-            (i, f"Seller {i}", round(random.uniform(0.05, 0.15), 3))
-        )
+    conn.executemany(
+        "INSERT INTO sellers VALUES (?, ?, ?)",
+        [(i, f"Seller {i}", round(random.uniform(0.05, 0.15), 3))
+         for i in range(1, 21)]
+    )
     
     # 150 products spread across sellers
-    for i in range(1, 151):
-        conn.execute(
-            "INSERT INTO products VALUES (?, ?, ?, ?)",
-            (i, f"Product {i}", round(random.uniform(9.99, 99.99), 2), 
-             random.randint(1, 20))
-        )
+    conn.executemany(
+        "INSERT INTO products VALUES (?, ?, ?, ?)",
+        [(i, f"Product {i}", round(random.uniform(9.99, 99.99), 2),
+          random.randint(1, 20))
+         for i in range(1, 151)]
+    )
     
     # 100 cart items in cart 1 (this makes N+1 very visible)
-    for i in range(1, 101):
-        conn.execute(
-            "INSERT INTO cart_items VALUES (?, 1, ?, ?)",
-            (i, i, random.randint(1, 5))
-        )
+    conn.executemany(
+        "INSERT INTO cart_items VALUES (?, 1, ?, ?)",
+        [(i, i, random.randint(1, 5)) for i in range(1, 101)]
+    )
     
     conn.commit()
     conn.close()
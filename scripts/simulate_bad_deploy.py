@@ -56,10 +56,12 @@ def simulate_bad_deploy():
     print("\n📊 Generating traffic to expose regression...")
     
     def send_traffic():
+        # Reuse one connection for the whole burst
+        session = requests.Session()
         for i in range(30):
             try:
-                requests.get(
-                    "http://localhost:5000/checkout",
+                session.get(
+                    "http://127.0.0.1:5000/checkout",
                     headers={
                         "X-User-ID": f"user-{i % 10}",
                         "X-Session-ID": f"session-{i}"
@@ -85,18 +87,22 @@ def _update_env(key: str, value: str):
     with open(env_path, "r") as f:
         lines = f.readlines()
     
-    updated = False
+    new_line = f"{key}={value}\n"
+    changed = True
     for i, line in enumerate(lines):
         if line.startswith(f"{key}="):
-            lines[i] = f"{key}={value}\n"
-            updated = True
+            changed = line != new_line
+            lines[i] = new_line
             break
-    
-    if not updated:
-        lines.append(f"{key}={value}\n")
-    
-    with open(env_path, "w") as f:
-        f.writelines(lines)
+    else:
+        lines.append(new_line)
+    
+    # Only rewrite when the value moved, and swap the file in whole
+    # so the app never reads a half-written .env
+    if changed:
+        with open(env_path + ".tmp", "w") as f:
+            f.writelines(lines)
+        os.replace(env_path + ".tmp", env_path)
     
     # Also update os.environ for running process
     os.environ[key] = value
@@ -30,10 +30,12 @@ def simulate_good_deploy():
     
     print("\n📊 Verifying recovery...")
     latencies = []
+    # Reuse one connection, so the probe times requests, not TCP setup
+    session = requests.Session()
     for i in range(10):
         start = time.time()
         try:
-            requests.get("http://localhost:5000/checkout", timeout=5)
+            session.get("http://127.0.0.1:5000/checkout", timeout=5)
             latencies.append((time.time() - start) * 1000)
         except Exception:
             pass
@@ -51,12 +53,16 @@ def simulate_good_deploy():
 def _update_env(key: str, value: str):
     with open(".env", "r") as f:
         lines = f.readlines()
+    changed = False
     for i, line in enumerate(lines):
         if line.startswith(f"{key}="):
+            changed = line != f"{key}={value}\n"
             lines[i] = f"{key}={value}\n"
             break
-    with open(".env", "w") as f:
-        f.writelines(lines)
+    if changed:
+        with open(".env.tmp", "w") as f:
+            f.writelines(lines)
+        os.replace(".env.tmp", ".env")
     os.environ[key] = value
 
 
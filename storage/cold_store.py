@@ -11,11 +11,16 @@
 # the relevant time range - fast even with months of data.
 
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
+import pyarrow.dataset as ds
 import os
+import json
+import time
 import logging
-from datetime import datetime
-from typing import List
+import itertools
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 from ingestion.event_schema import EventSchema
 import config
 
@@ -37,6 +42,45 @@ ARROW_SCHEMA = pa.schema([
     pa.field("error_message",    pa.string()),
 ])
 
+# Rows per Parquet row group. A 5 minute flush fits in one; bigger
+# backfills split so the endpoint filter can skip whole groups.
+ROW_GROUP_SIZE = 50_000
+
+# Options for every Parquet file we write. Dictionary encoding only on
+# the low-cardinality columns - user/session ids are near unique and
+# would just overflow the dictionary. Statistics feed the row group
+# pruning in read_historical.
+WRITE_OPTIONS = dict(
+    compression="zstd",
+    compression_level=3,
+    use_dictionary=["endpoint", "method", "commit_sha", "error_message"],
+    row_group_size=ROW_GROUP_SIZE,
+    data_page_size=1 << 20,
+    write_statistics=True,
+)
+
+# Reads for historical scans: pre_buffer coalesces each file's column
+# chunk reads into a few large requests issued ahead of decoding, on
+# pyarrow's I/O thread pool (the default only on newer pyarrow)
+PARQUET_FORMAT = ds.ParquetFileFormat(
+    default_fragment_scan_options=ds.ParquetFragmentScanOptions(pre_buffer=True)
+)
+
+# Parquet file names: a per-process id plus a counter. The id includes
+# the start time, not just the pid - a restarted collector can get its
+# old pid back and would otherwise overwrite its earlier files.
+_FILE_ID = f"{os.getpid()}-{time.time_ns()}"
+_file_seq = itertools.count()
+
+# Flush files are "part-*", merged ones "compacted-*". A compacted file
+# lists the files it replaced under this key in its Parquet metadata.
+COMPACTED_PREFIX = "compacted-"
+COMPACTED_FROM_KEY = b"argus.compacted_from"
+
+
+def _next_filename(kind: str = "part") -> str:
+    return f"{kind}-{_FILE_ID}-{next(_file_seq):06d}.parquet"
+
 
 class ColdStore:
     """
@@ -55,6 +99,8 @@ class ColdStore:
     
     def __init__(self):
         os.makedirs(config.DATA_DIR, exist_ok=True)
+        # Partition directories already created - one per hour, so tiny
+        self._created_partitions: set = set()
         logger.info(f"ColdStore initialized at {config.DATA_DIR}")
     
     def _get_partition_path(self, dt: datetime) -> str:
@@ -62,42 +108,33 @@ class ColdStore:
         Build the partition path for a given timestamp.
         Creates Hive-style partitioning: year=X/month=X/day=X/hour=X
         """
-        path = os.path.join(
+        path = self._partition_dir(dt)
+        # Every 5-minute flush lands in the same hour - only the first
+        # one needs the makedirs
+        if path not in self._created_partitions:
+            os.makedirs(path, exist_ok=True)
+            self._created_partitions.add(path)
+        return path
+    
+    @staticmethod
+    def _partition_dir(dt: datetime) -> str:
+        """Partition path for a timestamp, without creating it (for reads)"""
+        return os.path.join(
             config.DATA_DIR,
             f"year={dt.year}",
             f"month={dt.month:02d}",
             f"day={dt.day:02d}",
             f"hour={dt.hour:02d}"
         )
-        os.makedirs(path, exist_ok=True)
-        return path
     
     def flush(self, events: List[EventSchema]):
         """
         Write a batch of events to Parquet.
-        Called every 5 minutes by the collector.
         Groups events by hour partition.
         """
         if not events:
             return
         
-        # Group events by their hour partition
-        partitions = {}
-        for event in events:
-            partition_path = self._get_partition_path(event.timestamp)
-            if partition_path not in partitions:
-                partitions[partition_path] = []
-            partitions[partition_path].append(event)
-        
-        # Write each partition to its own file
-        for partition_path, partition_events in partitions.items():
-            self._write_partition(partition_path, partition_events)
-        
-        logger.info(f"Flushed {len(events)} events to {len(partitions)} partitions")
-    
-    def _write_partition(self, path: str, events: List[EventSchema]):
-        """Write events to a single Parquet file in the partition directory"""
-        
         # Convert events to columnar format for PyArrow
         data = {
             "timestamp":        [e.timestamp for e in events],
@@ -113,44 +150,206 @@ class ColdStore:
             "commit_sha":       [e.commit_sha for e in events],
             "error_message":    [e.error_message or "" for e in events],
         }
+        self.flush_batches([pa.table(data, schema=ARROW_SCHEMA)])
+    
+    def flush_batches(self, batches: List[pa.Table]):
+        """
+        Write batches that are already columnar to Parquet.
+        Called every 5 minutes by the collector with the tables
+        HotStore.insert_many built at ingest, so events are only ever
+        turned into columns once.
+        Groups rows by hour partition.
+        """
+        batches = [self._to_cold_schema(b) for b in batches if b.num_rows]
+        if not batches:
+            return
+        table = pa.concat_tables(batches)
         
-        table = pa.table(data, schema=ARROW_SCHEMA)
+        # One sort by (hour, endpoint) groups every partition into a
+        # contiguous run, already in the endpoint order each file is
+        # written in - row group min/max stats let read_historical's
+        # endpoint filter skip the rest, and the dictionary-encoded
+        # string columns compress better
+        hours = pc.floor_temporal(table.column("timestamp"), unit="hour")
+        order = pc.sort_indices(
+            pa.table({"hour": hours, "endpoint": table.column("endpoint")}),
+            sort_keys=[("hour", "ascending"), ("endpoint", "ascending")]
+        )
+        table = table.take(order)
         
-        # Filename includes timestamp to avoid collisions
-        filename = f"part-{datetime.now().strftime('%H%M%S%f')}.parquet"
-        filepath = os.path.join(path, filename)
+        # Sorted, so value_counts yields the hours in order - write each
+        # run to its own partition as a zero-copy slice
+        partitions = pc.value_counts(hours.take(order))
+        offset = 0
+        for partition in partitions:
+            count = partition["counts"].as_py()
+            self._write_partition(
+                self._get_partition_path(partition["values"].as_py()),
+                table.slice(offset, count)
+            )
+            offset += count
         
-        pq.write_table(table, filepath, compression="snappy")
+        logger.info(f"Flushed {table.num_rows} events to {len(partitions)} partitions")
     
-    def read_historical(self, endpoint: str, hours_back: int) -> List[dict]:
+    @staticmethod
+    def _to_cold_schema(batch: pa.Table) -> pa.Table:
+        """Cold files store a missing error_message as "" and ms timestamps"""
+        index = batch.schema.get_field_index("error_message")
+        batch = batch.set_column(
+            index, "error_message",
+            pc.fill_null(batch.column(index), "")
+        )
+        # ms is the cold store's resolution - drop the sub-ms digits
+        return batch.cast(ARROW_SCHEMA, safe=False)
+    
+    def _write_partition(self, path: str, table: pa.Table):
+        """Write rows, sorted by endpoint, to one Parquet file in the partition"""
+        
+        filepath = os.path.join(path, _next_filename())
+        
+        pq.write_table(table, filepath, **WRITE_OPTIONS)
+    
+    def compact_closed_partitions(self, hours_back: int = 24):
         """
-        Read historical events for an endpoint.
-        Used by baseline engine to compute normal behavior over 7 days.
-        Only reads relevant partitions - won't scan everything.
+        Merge each finished hour's flush files into one Parquet file.
+        Every 5 minute flush writes its own small file, so a closed hour
+        holds a dozen; merging them keeps footer/metadata overhead and
+        file opens in read_historical down to one per hour. The
+        current hour is still being flushed to and is left alone.
         """
-        results = []
         now = datetime.now()
         
-        for hours_ago in range(hours_back):
-            dt = datetime.fromtimestamp(
-                now.timestamp() - (hours_ago * 3600)
-            )
-            partition_path = self._get_partition_path(dt)
-            
+        for hours_ago in range(1, hours_back + 1):
+            partition_path = self._partition_dir(now - timedelta(hours=hours_ago))
             if not os.path.exists(partition_path):
                 continue
             
-            # Read all parquet files in this partition
-            for filename in os.listdir(partition_path):
-                if not filename.endswith(".parquet"):
+            files, leftovers = self._partition_files(partition_path)
+            
+            # Finish a compaction cut off before it deleted its sources -
+            # the merged file already has their rows
+            for f in leftovers:
+                os.remove(f)
+            
+            # One file means already compacted (or a single flush) -
+            # nothing to merge, so a rerun never merges twice
+            if len(files) < 2:
+                continue
+            
+            table = pa.concat_tables(
+                pq.read_table(f, schema=ARROW_SCHEMA) for f in files
+            ).sort_by("endpoint")
+            table = table.replace_schema_metadata({
+                COMPACTED_FROM_KEY: json.dumps(
+                    [os.path.basename(f) for f in files]
+                )
+            })
+            
+            # Written under a non-.parquet name, then renamed into place,
+            # so readers never see a half-written file. From the rename on,
+            # readers skip the sources even before they're deleted.
+            compacted = os.path.join(
+                partition_path, _next_filename(COMPACTED_PREFIX.rstrip("-"))
+            )
+            pq.write_table(table, compacted + ".tmp", **WRITE_OPTIONS)
+            os.replace(compacted + ".tmp", compacted)
+            for f in files:
+                os.remove(f)
+            
+            logger.info(
+                f"Compacted {len(files)} files in {partition_path}"
+            )
+    
+    @staticmethod
+    def _partition_files(partition_path: str) -> Tuple[List[str], List[str]]:
+        """
+        (live, leftover) files in one partition. Files a compacted file
+        says it replaced are leftovers - still on disk only because the
+        compaction hasn't deleted them yet, or was cut off before it
+        could - and reading them too would count their rows twice.
+        So are half-written .tmp files from an interrupted compaction.
+        """
+        names = os.listdir(partition_path)
+        parquet = [n for n in names if n.endswith(".parquet")]
+        
+        # Only a partition with several files can hold leftovers - the
+        # usual compacted hour is one file, and costs no footer read
+        replaced = set()
+        if len(parquet) > 1:
+            for name in parquet:
+                if not name.startswith(COMPACTED_PREFIX):
                     continue
-                
-                filepath = os.path.join(partition_path, filename)
-                table = pq.read_table(
-                    filepath,
-                    filters=[("endpoint", "=", endpoint)]
+                metadata = pq.read_schema(
+                    os.path.join(partition_path, name)
+                ).metadata or {}
+                replaced.update(
+                    json.loads(metadata.get(COMPACTED_FROM_KEY, b"[]"))
                 )
-                
-                results.extend(table.to_pylist())
         
-        return results
\ No newline at end of file
+        live = sorted(
+            os.path.join(partition_path, n)
+            for n in parquet if n not in replaced
+        )
+        leftovers = [
+            os.path.join(partition_path, n)
+            for n in names if n in replaced or n.endswith(".parquet.tmp")
+        ]
+        return live, leftovers
+    
+    def recent_files(self, hours_back: int) -> List[str]:
+        """Parquet files in the last N hour partitions, current hour included"""
+        now = datetime.now()
+        files = []
+        
+        # Naive wall-clock steps, matching how partitions are named from
+        # event timestamps - an hour repeated by a DST change is one
+        # directory, so it's listed once rather than twice
+        for hours_ago in range(hours_back):
+            partition_path = self._partition_dir(now - timedelta(hours=hours_ago))
+            
+            if not os.path.exists(partition_path):
+                continue
+            
+            files.extend(self._partition_files(partition_path)[0])
+        
+        return files
+    
+    def read_historical(self, endpoint: str, hours_back: int,
+                        columns: Optional[List[str]] = None) -> pa.Table:
+        """
+        Read historical events for an endpoint as one Arrow table.
+        Used by baseline engine to compute normal behavior over 7 days.
+        Only reads relevant partitions - won't scan everything - and
+        only the requested columns from each file. The endpoint and
+        time filters are pushed down to Parquet row group statistics.
+        """
+        cutoff = datetime.now() - timedelta(hours=hours_back)
+        
+        try:
+            return self._scan(
+                self.recent_files(hours_back), endpoint, cutoff, columns
+            )
+        except FileNotFoundError:
+            # The collector compacted a partition between listing and
+            # reading it - list again, the merged file now stands in
+            return self._scan(
+                self.recent_files(hours_back), endpoint, cutoff, columns
+            )
+    
+    @staticmethod
+    def _scan(files: List[str], endpoint: str, cutoff: datetime,
+              columns: Optional[List[str]]) -> pa.Table:
+        if not files:
+            schema = ARROW_SCHEMA
+            if columns is not None:
+                schema = pa.schema([ARROW_SCHEMA.field(c) for c in columns])
+            return schema.empty_table()
+        
+        # One dataset over just these files - scanned in parallel,
+        # skipping row groups whose stats rule out the filter
+        dataset = ds.dataset(files, schema=ARROW_SCHEMA, format=PARQUET_FORMAT)
+        return dataset.to_table(
+            columns=columns,
+            filter=(ds.field("endpoint") == endpoint)
+                   & (ds.field("timestamp") >= pa.scalar(cutoff, pa.timestamp("ms")))
+        )
@@ -7,14 +7,43 @@
 # Think of this as the "live view" of what's happening right now.
 
 import duckdb
+import pyarrow as pa
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional
 from ingestion.event_schema import EventSchema
 import config
 
 logger = logging.getLogger(__name__)
 
+# Arrow layout of the events table, for insert_many
+BATCH_SCHEMA = pa.schema([
+    pa.field("timestamp",        pa.timestamp("us")),
+    pa.field("endpoint",         pa.string()),
+    pa.field("method",           pa.string()),
+    pa.field("status_code",      pa.int32()),
+    pa.field("latency_ms",       pa.float64()),
+    pa.field("db_query_count",   pa.int32()),
+    pa.field("db_query_time_ms", pa.float64()),
+    pa.field("user_id",          pa.string()),
+    pa.field("session_id",       pa.string()),
+    pa.field("memory_mb",        pa.float64()),
+    pa.field("commit_sha",       pa.string()),
+    pa.field("error_message",    pa.string()),
+])
+
+
+def _cutoff(minutes: int) -> datetime:
+    """
+    Start of the last N minutes, as a plain TIMESTAMP parameter.
+    NOW() is a TIMESTAMPTZ, so comparing against it casts every row and
+    DuckDB can't skip row groups by their timestamp min/max. Events are
+    appended in time order, so with a bound value the filter goes
+    straight to the recent tail of the table.
+    """
+    return datetime.now() - timedelta(minutes=minutes)
+
 
 class HotStore:
     """
@@ -30,15 +59,36 @@ class HotStore:
     def __init__(self):
         # In-memory DuckDB - data lives only while process is running
         self.conn = duckdb.connect(":memory:")
+        self._local = threading.local()
         self._create_table()
+        # Held by every write - the purge swaps the whole table out and
+        # must not drop an insert landing mid-swap
+        self._write_lock = threading.Lock()
+        
+        # {endpoint: newest event timestamp} - a handful of endpoints,
+        # so listing them needn't scan the events table
+        self._last_seen: Dict[str, datetime] = {}
         logger.info("HotStore initialized")
     
+    def _cursor(self) -> duckdb.DuckDBPyConnection:
+        """
+        This thread's cursor on the in-memory database.
+        A DuckDB connection isn't safe to use from several threads at
+        once - the collector's request threads and its scheduler each
+        get their own cursor, all seeing the same tables.
+        """
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self.conn.cursor()
+            self._local.cursor = cursor
+        return cursor
+    
     def _create_table(self):
         """
         Create the events table matching EventSchema exactly.
         Every field in EventSchema becomes a column here.
         """
-        self.conn.execute("""
+        self._cursor().execute("""
             CREATE TABLE events (
                 timestamp        TIMESTAMP,
                 endpoint         VARCHAR,
@@ -60,38 +110,148 @@ class HotStore:
         Insert one event. Called by collector for every request.
         This is the hot path - needs to be fast.
         """
-        self.conn.execute("""
-            INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, [
-            event.timestamp,
-            event.endpoint,
-            event.method,
-            event.status_code,
-            event.latency_ms,
-            event.db_query_count,
-            event.db_query_time_ms,
-            event.user_id,
-            event.session_id,
-            event.memory_mb,
-            event.commit_sha,
-            event.error_message
-        ])
+        with self._write_lock:
+            self._cursor().execute("""
+                INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                event.timestamp,
+                event.endpoint,
+                event.method,
+                event.status_code,
+                event.latency_ms,
+                event.db_query_count,
+                event.db_query_time_ms,
+                event.user_id,
+                event.session_id,
+                event.memory_mb,
+                event.commit_sha,
+                event.error_message
+            ])
+        
+        self._mark_seen(event)
+    
+    def insert_many(self, events: List[EventSchema]) -> pa.Table:
+        """
+        Insert a batch of events in one statement.
+        The collector gets batches from the middleware - handing DuckDB
+        whole columns skips the per-row bind and INSERT of insert().
+        Returns the Arrow table built for the insert, which the collector
+        keeps for the cold store flush.
+        """
+        if not events:
+            return BATCH_SCHEMA.empty_table()
+        
+        batch = pa.table({
+            "timestamp":        [e.timestamp for e in events],
+            "endpoint":         [e.endpoint for e in events],
+            "method":           [e.method for e in events],
+            "status_code":      [e.status_code for e in events],
+            "latency_ms":       [e.latency_ms for e in events],
+            "db_query_count":   [e.db_query_count for e in events],
+            "db_query_time_ms": [e.db_query_time_ms for e in events],
+            "user_id":          [e.user_id for e in events],
+            "session_id":       [e.session_id for e in events],
+            "memory_mb":        [e.memory_mb for e in events],
+            "commit_sha":       [e.commit_sha for e in events],
+            "error_message":    [e.error_message for e in events],
+        }, schema=BATCH_SCHEMA)
+        
+        with self._write_lock:
+            cursor = self._cursor()
+            cursor.register("_batch", batch)
+            try:
+                cursor.execute("INSERT INTO events SELECT * FROM _batch")
+            finally:
+                cursor.unregister("_batch")
+        
+        for event in events:
+            self._mark_seen(event)
+        
+        return batch
+    
+    def bulk_load_from_cold(self, files: List[str], minutes: int):
+        """
+        Fill the store with the last N minutes of flushed events.
+        Called when the collector starts, so detection has its window
+        back right away instead of waiting for it to refill. DuckDB
+        reads the Parquet files itself - one scan, no per-event inserts.
+        """
+        if not files:
+            return
+        
+        with self._write_lock:
+            loaded = self._cursor().execute("""
+                INSERT INTO events
+                SELECT timestamp, endpoint, method, status_code, latency_ms,
+                       db_query_count, db_query_time_ms, user_id, session_id,
+                       memory_mb, commit_sha,
+                       NULLIF(error_message, '')  -- cold store writes None as ''
+                FROM read_parquet(?)
+                WHERE timestamp > ?
+            """, [files, _cutoff(minutes)]).fetchone()[0]
+        
+        for endpoint, last_seen in self._cursor().execute("""
+            SELECT endpoint, MAX(timestamp) FROM events GROUP BY endpoint
+        """).fetchall():
+            self._last_seen[endpoint] = last_seen
+        
+        logger.info(f"Loaded {loaded} events from cold store")
+    
+    def _mark_seen(self, event: EventSchema):
+        """Track the newest event time per endpoint, for get_all_endpoints"""
+        if event.timestamp > self._last_seen.get(event.endpoint, datetime.min):
+            self._last_seen[event.endpoint] = event.timestamp
     
     def get_recent_latency(self, endpoint: str, minutes: int) -> float:
         """
         Average latency for an endpoint in the last N minutes.
         Used by detector to compare current vs baseline.
         """
-        result = self.conn.execute("""
+        result = self._cursor().execute("""
             SELECT AVG(latency_ms) as avg_latency
             FROM events
             WHERE endpoint = ?
-              AND timestamp > NOW() - INTERVAL (?) MINUTE
+              AND timestamp > ?
               AND status_code < 500
-        """, [endpoint, minutes]).fetchone()
+        """, [endpoint, _cutoff(minutes)]).fetchone()
         
         return result[0] if result[0] else 0.0
     
+    def get_latencies_bulk(self, endpoints: List[str],
+                           windows: List[int]) -> Dict[str, Dict[int, float]]:
+        """
+        Average latency per endpoint for several windows in one scan.
+        Same filter as get_recent_latency, so values match it exactly.
+        
+        Returns: {endpoint: {minutes: avg_latency}} (0.0 = no data)
+        """
+        if not endpoints or not windows:
+            return {}
+        
+        window_columns = ",\n".join(
+            "AVG(latency_ms) FILTER "
+            "(WHERE timestamp > ?)"
+            for _ in windows
+        )
+        placeholders = ",".join(["?" for _ in endpoints])
+        
+        rows = self._cursor().execute(f"""
+            SELECT endpoint,
+                {window_columns}
+            FROM events
+            WHERE endpoint IN ({placeholders})
+              AND timestamp > ?
+              AND status_code < 500
+            GROUP BY endpoint
+        """, [*map(_cutoff, windows), *endpoints, _cutoff(max(windows))]).fetchall()
+        
+        result = {ep: {w: 0.0 for w in windows} for ep in endpoints}
+        for row in rows:
+            result[row[0]] = {
+                w: value or 0.0 for w, value in zip(windows, row[1:])
+            }
+        return result
+    
     def get_latency_trend(self, endpoint: str) -> List[dict]:
         """
         Latency per minute for the last 30 minutes.
@@ -99,7 +259,7 @@ class HotStore:
         
         Returns list of: {minute, avg_latency, p95_latency, request_count}
         """
-        rows = self.conn.execute("""
+        rows = self._cursor().execute("""
             SELECT 
                 DATE_TRUNC('minute', timestamp) as minute,
                 AVG(latency_ms) as avg_latency,
@@ -107,10 +267,10 @@ class HotStore:
                 COUNT(*) as request_count
             FROM events
             WHERE endpoint = ?
-              AND timestamp > NOW() - INTERVAL 30 MINUTE
+              AND timestamp > ?
             GROUP BY DATE_TRUNC('minute', timestamp)
             ORDER BY minute ASC
-        """, [endpoint]).fetchall()
+        """, [endpoint, _cutoff(30)]).fetchall()
         
         return [
             {
@@ -122,22 +282,57 @@ class HotStore:
             for r in rows
         ]
     
+    def get_trend(self, endpoint: str) -> List[dict]:
+        """
+        get_latency_trend and get_query_count_trend in one scan.
+        Per minute for the last 30 minutes, for callers that want both.
+        
+        Returns list of: {minute, avg_latency, p95_latency, request_count,
+                          avg_queries, max_queries}
+        """
+        rows = self._cursor().execute("""
+            SELECT 
+                DATE_TRUNC('minute', timestamp) as minute,
+                AVG(latency_ms) as avg_latency,
+                PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY latency_ms) as p95_latency,
+                COUNT(*) as request_count,
+                AVG(db_query_count) as avg_queries,
+                MAX(db_query_count) as max_queries
+            FROM events
+            WHERE endpoint = ?
+              AND timestamp > ?
+            GROUP BY DATE_TRUNC('minute', timestamp)
+            ORDER BY minute ASC
+        """, [endpoint, _cutoff(30)]).fetchall()
+        
+        return [
+            {
+                "minute": str(r[0]),
+                "avg_latency": round(r[1], 2),
+                "p95_latency": round(r[2], 2),
+                "request_count": r[3],
+                "avg_queries": round(r[4], 1),
+                "max_queries": r[5]
+            }
+            for r in rows
+        ]
+    
     def get_query_count_trend(self, endpoint: str) -> List[dict]:
         """
         DB query count per minute for last 30 minutes.
         Key signal for N+1 detection - sudden jump = new loop added.
         """
-        rows = self.conn.execute("""
+        rows = self._cursor().execute("""
             SELECT 
                 DATE_TRUNC('minute', timestamp) as minute,
                 AVG(db_query_count) as avg_queries,
                 MAX(db_query_count) as max_queries
             FROM events
             WHERE endpoint = ?
-              AND timestamp > NOW() - INTERVAL 30 MINUTE
+              AND timestamp > ?
             GROUP BY DATE_TRUNC('minute', timestamp)
             ORDER BY minute ASC
-        """, [endpoint]).fetchall()
+        """, [endpoint, _cutoff(30)]).fetchall()
         
         return [
             {
@@ -148,21 +343,74 @@ class HotStore:
             for r in rows
         ]
     
+    def get_current_metrics(self, minutes: int) -> Dict[str, Dict[str, float]]:
+        """
+        Recent latency (as get_recent_latency) and the mean of the last
+        N per-minute query-count averages, for every endpoint seen in the
+        last 30 minutes, in one query.
+        Lets the detector check all endpoints per tick without a pair of
+        queries (HTTP calls, from the agent) per endpoint.
+        
+        Returns: {endpoint: {"latency": float, "queries": float}}
+        """
+        window = _cutoff(30)
+        rows = self._cursor().execute("""
+            WITH per_minute AS (
+                SELECT endpoint,
+                    AVG(db_query_count) as avg_queries,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY endpoint
+                        ORDER BY DATE_TRUNC('minute', timestamp) DESC
+                    ) as recency
+                FROM events
+                WHERE timestamp > ?
+                GROUP BY endpoint, DATE_TRUNC('minute', timestamp)
+            ),
+            queries AS (
+                SELECT endpoint, AVG(avg_queries) as avg_queries
+                FROM per_minute
+                WHERE recency <= ?
+                GROUP BY endpoint
+            ),
+            latency AS (
+                SELECT endpoint,
+                    AVG(latency_ms) FILTER (
+                        WHERE timestamp > ? AND status_code < 500
+                    ) as avg_latency
+                FROM events
+                WHERE timestamp > ?
+                GROUP BY endpoint
+            )
+            SELECT latency.endpoint, avg_latency, avg_queries
+            FROM latency LEFT JOIN queries USING (endpoint)
+        """, [window, minutes, _cutoff(minutes), window]).fetchall()
+        
+        return {
+            r[0]: {"latency": r[1] or 0.0, "queries": r[2] or 0.0}
+            for r in rows
+        }
+    
     def get_affected_users(self, endpoint: str, since: datetime, 
-                           latency_threshold_ms: float) -> List[str]:
+                           latency_threshold_ms: float,
+                           limit: Optional[int] = None) -> List[str]:
         """
         Which specific user IDs are experiencing slow responses.
         This is the customer-level tracking Firetiger emphasizes.
+        limit caps how many are returned (None = all).
         """
-        rows = self.conn.execute("""
+        # Anonymous traffic gets a fresh id per request, so this can be
+        # thousands of rows - fetch the column in one piece rather than
+        # a tuple per row
+        user_ids = self._cursor().execute("""
             SELECT DISTINCT user_id
             FROM events
             WHERE endpoint = ?
               AND timestamp > ?
               AND latency_ms > ?
-        """, [endpoint, since, latency_threshold_ms]).fetchall()
+            LIMIT ?
+        """, [endpoint, since, latency_threshold_ms, limit]).fetchnumpy()["user_id"]
         
-        return [r[0] for r in rows]
+        return user_ids.tolist()
     
     def get_recent_commit_shas(self, endpoint: str) -> List[str]:
         """
@@ -170,14 +418,14 @@ class HotStore:
         Used to identify which deploy introduced a regression.
         A new SHA appearing = a deploy happened.
         """
-        rows = self.conn.execute("""
+        rows = self._cursor().execute("""
             SELECT DISTINCT commit_sha, MIN(timestamp) as first_seen
             FROM events
             WHERE endpoint = ?
-              AND timestamp > NOW() - INTERVAL 30 MINUTE
+              AND timestamp > ?
             GROUP BY commit_sha
             ORDER BY first_seen DESC
-        """, [endpoint]).fetchall()
+        """, [endpoint, _cutoff(30)]).fetchall()
         
         return [r[0] for r in rows]
     
@@ -187,7 +435,7 @@ class HotStore:
         Gets baseline stats from BEFORE a specific commit appeared.
         Used by characterize step to establish the "before" picture.
         """
-        result = self.conn.execute("""
+        result = self._cursor().execute("""
             SELECT 
                 AVG(latency_ms) as avg_latency,
                 AVG(db_query_count) as avg_queries,
@@ -196,8 +444,8 @@ class HotStore:
             FROM events
             WHERE endpoint = ?
               AND commit_sha != ?
-              AND timestamp > NOW() - INTERVAL 30 MINUTE
-        """, [endpoint, commit_sha]).fetchone()
+              AND timestamp > ?
+        """, [endpoint, commit_sha, _cutoff(30)]).fetchone()
         
         return {
             "avg_latency": result[0] or 0.0,
@@ -208,26 +456,32 @@ class HotStore:
     
     def get_all_endpoints(self) -> List[str]:
         """All endpoints seen in last 30 minutes"""
-        rows = self.conn.execute("""
-            SELECT DISTINCT endpoint 
-            FROM events 
-            WHERE timestamp > NOW() - INTERVAL 30 MINUTE
-        """).fetchall()
-        return [r[0] for r in rows]
+        cutoff = _cutoff(30)
+        return [
+            endpoint for endpoint, last_seen in list(self._last_seen.items())
+            if last_seen > cutoff
+        ]
     
     def purge_old_events(self):
         """
         Delete events older than HOT_STORE_WINDOW_MIN.
         Called every 5 minutes to keep memory usage bounded.
+        Rebuilds the table from the rows to keep rather than DELETEing:
+        a columnar DELETE only marks rows, and the rebuild hands the
+        dropped row groups' memory back.
         """
-        deleted = self.conn.execute("""
-            DELETE FROM events 
-            WHERE timestamp < NOW() - INTERVAL (?) MINUTE
-        """, [config.HOT_STORE_WINDOW_MIN]).rowcount
+        with self._write_lock:
+            before = self.get_event_count()
+            kept = self._cursor().execute("""
+                CREATE OR REPLACE TABLE events AS
+                SELECT * FROM events
+                WHERE timestamp >= ?
+            """, [_cutoff(config.HOT_STORE_WINDOW_MIN)]).fetchone()[0]
+        deleted = before - kept
         
         if deleted > 0:
             logger.info(f"Purged {deleted} old events from hot store")
     
     def get_event_count(self) -> int:
         """Total events currently in hot store"""
-        return self.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
\ No newline at end of file
+        return self._cursor().execute("SELECT COUNT(*) FROM events").fetchone()[0]
\ No newline at end of file
@@ -9,15 +9,21 @@
 #   confirms faster, more confident fix.
 
 import sqlite3
+import threading
 import json
 import logging
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, List, Optional, Tuple
 import config
 
 logger = logging.getLogger(__name__)
 
 
+def _dict_row(cursor: sqlite3.Cursor, row: tuple) -> dict:
+    """Row factory building the dicts callers get straight from the tuple"""
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
 class KnowledgeGraph:
     """
     Persistent memory of past incidents and learned patterns.
@@ -28,12 +34,61 @@ class KnowledgeGraph:
     """
     
     def __init__(self):
-        self.conn = sqlite3.connect(config.KNOWLEDGE_DB_PATH, 
-                                     check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        # Each thread gets its own connection, so WAL readers on the
+        # detector, baseline and investigation threads don't queue on
+        # one shared connection
+        self._local = threading.local()
+        self.conn = self._connect()
+        # The constructing thread uses the connection it just opened
+        self._local.conn = self.conn
+        # Baselines are recomputed from several threads at once and
+        # incidents are saved off the investigation thread - one writer
+        # at a time
+        self._write_lock = threading.Lock()
+        # Bumped on every baseline write, so readers can cache baselines
+        # and only re-read them after a recompute
+        self.baseline_version = 0
         self._create_tables()
         logger.info("KnowledgeGraph initialized")
     
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Every connection to :memory: is a new, empty database -
+            # there all threads share the first one
+            if config.KNOWLEDGE_DB_PATH == ":memory:":
+                conn = self.conn
+            else:
+                conn = self._connect()
+            self._local.conn = conn
+        return conn
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(config.KNOWLEDGE_DB_PATH, 
+                               check_same_thread=False)
+        conn.row_factory = _dict_row
+        self._configure(conn)
+        return conn
+    
+    def _configure(self, conn: sqlite3.Connection):
+        """
+        WAL lets readers (hypothesize) run alongside the background
+        incident write, and synchronous=NORMAL drops the per-commit fsync.
+        Lock waits are covered by sqlite3.connect's default 5s timeout.
+        """
+        # An in-memory database has no journal file to put in WAL mode
+        if config.KNOWLEDGE_DB_PATH != ":memory:":
+            conn.executescript("""
+                PRAGMA journal_mode = WAL;
+                PRAGMA synchronous = NORMAL;
+            """)
+        conn.executescript("""
+            PRAGMA temp_store = MEMORY;
+            PRAGMA cache_size = -20000;
+            PRAGMA mmap_size = 268435456;
+        """)
+    
     def _create_tables(self):
         """Create all three tables if they don't exist"""
         
@@ -71,6 +126,12 @@ class KnowledgeGraph:
                 resolved                INTEGER DEFAULT 0   -- 0=no, 1=yes
             );
             
+            -- get_similar_incidents: seek to the endpoint's resolved
+            -- incidents and read the newest 5 off the index, no sort.
+            -- Partial, so open incidents never enter it.
+            CREATE INDEX IF NOT EXISTS idx_incidents_resolved_endpoint
+                ON incidents(endpoint, started_at DESC) WHERE resolved = 1;
+            
             -- Patterns learned about specific files
             -- "db.py changes often cause N+1 issues"
             CREATE TABLE IF NOT EXISTS patterns (
@@ -90,123 +151,143 @@ class KnowledgeGraph:
         Get normal performance for an endpoint at a specific time.
         Returns None if no baseline established yet.
         """
-        row = self.conn.execute("""
+        return self._conn().execute("""
             SELECT * FROM baselines
             WHERE endpoint = ? AND hour_of_day = ? AND day_of_week = ?
         """, [endpoint, hour, day_of_week]).fetchone()
-        
-        return dict(row) if row else None
+    
+    def get_baselines(self, endpoint: str) -> List[dict]:
+        """All hour/day baselines for an endpoint, in one query"""
+        return self._conn().execute("""
+            SELECT * FROM baselines WHERE endpoint = ?
+        """, [endpoint]).fetchall()
     
     def update_baseline(self, endpoint: str, hour: int, 
                         day_of_week: int, metrics: dict):
         """
         Update or create baseline for an endpoint/time combination.
+        """
+        self.update_baselines(endpoint, {(hour, day_of_week): metrics})
+    
+    def update_baselines(self, endpoint: str,
+                         slots: Dict[Tuple[int, int], dict]):
+        """
+        Update or create baselines for many {(hour, day_of_week): metrics}
+        slots of an endpoint in one transaction - a single commit, not
+        one per slot.
         Called hourly by baseline engine.
         """
-        self.conn.execute("""
-            INSERT INTO baselines 
-                (endpoint, hour_of_day, day_of_week, avg_latency_ms, 
-                 p95_latency_ms, avg_query_count, sample_size, last_updated)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(endpoint, hour_of_day, day_of_week) 
-            DO UPDATE SET
-                avg_latency_ms  = excluded.avg_latency_ms,
-                p95_latency_ms  = excluded.p95_latency_ms,
-                avg_query_count = excluded.avg_query_count,
-                sample_size     = excluded.sample_size,
-                last_updated    = excluded.last_updated
-        """, [
-            endpoint, hour, day_of_week,
-            metrics["avg_latency_ms"],
-            metrics["p95_latency_ms"],
-            metrics["avg_query_count"],
-            metrics["sample_size"],
-            datetime.now().isoformat()
-        ])
-        self.conn.commit()
+        now = datetime.now().isoformat()
+        rows = [
+            (endpoint, hour, day_of_week,
+             metrics["avg_latency_ms"],
+             metrics["p95_latency_ms"],
+             metrics["avg_query_count"],
+             metrics["sample_size"],
+             now)
+            for (hour, day_of_week), metrics in slots.items()
+        ]
+        if not rows:
+            return
+        
+        with self._write_lock:
+            with self._conn() as conn:
+                conn.executemany("""
+                    INSERT INTO baselines 
+                        (endpoint, hour_of_day, day_of_week, avg_latency_ms, 
+                         p95_latency_ms, avg_query_count, sample_size, last_updated)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(endpoint, hour_of_day, day_of_week) 
+                    DO UPDATE SET
+                        avg_latency_ms  = excluded.avg_latency_ms,
+                        p95_latency_ms  = excluded.p95_latency_ms,
+                        avg_query_count = excluded.avg_query_count,
+                        sample_size     = excluded.sample_size,
+                        last_updated    = excluded.last_updated
+                """, rows)
+            # Bumped only once committed - a reader that sees the new
+            # version must also see the new rows
+            self.baseline_version += 1
     
     def get_similar_incidents(self, endpoint: str) -> List[dict]:
         """
         Past incidents on the same endpoint.
         Agent uses this to say "I've seen this before, it was probably X"
         """
-        rows = self.conn.execute("""
+        return self._conn().execute("""
             SELECT * FROM incidents
             WHERE endpoint = ? AND resolved = 1
             ORDER BY started_at DESC
             LIMIT 5
         """, [endpoint]).fetchall()
-        
-        return [dict(r) for r in rows]
     
     def get_patterns_for_files(self, file_paths: List[str]) -> List[dict]:
         """
         Check if changed files have caused incidents before.
         If db.py has caused 3 N+1 issues, that's a strong signal.
         """
-        placeholders = ",".join(["?" for _ in file_paths])
-        rows = self.conn.execute(f"""
+        # Paths go in as one JSON array, so the SQL text is the same for
+        # any number of files and sqlite3's statement cache can reuse it
+        return self._conn().execute("""
             SELECT * FROM patterns
-            WHERE file_path IN ({placeholders})
+            WHERE file_path IN (SELECT value FROM json_each(?))
             ORDER BY incident_count DESC
-        """, file_paths).fetchall()
-        
-        return [dict(r) for r in rows]
+        """, [json.dumps(file_paths)]).fetchall()
     
     def save_incident(self, incident_data: dict) -> int:
         """Save a new incident record. Returns the incident ID."""
-        cursor = self.conn.execute("""
-            INSERT INTO incidents 
-                (incident_id, endpoint, started_at, root_cause, 
-                 confidence_score, affected_user_count, commit_sha)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, [
-            incident_data["incident_id"],
-            incident_data["endpoint"],
-            incident_data["started_at"],
-            incident_data.get("root_cause"),
-            incident_data.get("confidence_score"),
-            incident_data.get("affected_user_count", 0),
-            incident_data.get("commit_sha")
-        ])
-        self.conn.commit()
-        return cursor.lastrowid
+        with self._write_lock, self._conn() as conn:
+            cursor = conn.execute("""
+                INSERT INTO incidents 
+                    (incident_id, endpoint, started_at, root_cause, 
+                     confidence_score, affected_user_count, commit_sha)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [
+                incident_data["incident_id"],
+                incident_data["endpoint"],
+                incident_data["started_at"],
+                incident_data.get("root_cause"),
+                incident_data.get("confidence_score"),
+                incident_data.get("affected_user_count", 0),
+                incident_data.get("commit_sha")
+            ])
+            return cursor.lastrowid
     
     def resolve_incident(self, incident_id: str, fix_applied: str,
                           time_to_detect: float, time_to_resolve: float):
         """Mark an incident as resolved with timing data"""
-        self.conn.execute("""
-            UPDATE incidents SET
-                resolved = 1,
-                resolved_at = ?,
-                fix_applied = ?,
-                time_to_detect_sec = ?,
-                time_to_resolve_sec = ?
-            WHERE incident_id = ?
-        """, [
-            datetime.now().isoformat(),
-            fix_applied,
-            time_to_detect,
-            time_to_resolve,
-            incident_id
-        ])
-        self.conn.commit()
+        with self._write_lock, self._conn() as conn:
+            conn.execute("""
+                UPDATE incidents SET
+                    resolved = 1,
+                    resolved_at = ?,
+                    fix_applied = ?,
+                    time_to_detect_sec = ?,
+                    time_to_resolve_sec = ?
+                WHERE incident_id = ?
+            """, [
+                datetime.now().isoformat(),
+                fix_applied,
+                time_to_detect,
+                time_to_resolve,
+                incident_id
+            ])
     
     def update_pattern(self, file_path: str, root_cause: str, fix: str):
         """
         Update or create a pattern for a file.
         Called after each resolved incident.
         """
-        self.conn.execute("""
-            INSERT INTO patterns 
-                (file_path, incident_count, common_root_cause, common_fix, last_seen)
-            VALUES (?, 1, ?, ?, ?)
-            ON CONFLICT(file_path) DO UPDATE SET
-                incident_count    = incident_count + 1,
-                common_root_cause = excluded.common_root_cause,
-                common_fix        = excluded.common_fix,
-                last_seen         = excluded.last_seen
-        """, [
-            file_path, root_cause, fix, datetime.now().isoformat()
-        ])
-        self.conn.commit()
\ No newline at end of file
+        with self._write_lock, self._conn() as conn:
+            conn.execute("""
+                INSERT INTO patterns 
+                    (file_path, incident_count, common_root_cause, common_fix, last_seen)
+                VALUES (?, 1, ?, ?, ?)
+                ON CONFLICT(file_path) DO UPDATE SET
+                    incident_count    = incident_count + 1,
+                    common_root_cause = excluded.common_root_cause,
+                    common_fix        = excluded.common_fix,
+                    last_seen         = excluded.last_seen
+            """, [
+                file_path, root_cause, fix, datetime.now().isoformat()
+            ])
\ No newline at end of file
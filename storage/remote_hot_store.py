@@ -3,9 +3,11 @@
 # This lets the agent read from the same HotStore the collector writes to.
 
 import requests
+import orjson
 import logging
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
-from typing import List
+from typing import Dict, List, Optional
 import config
 
 logger = logging.getLogger(__name__)
@@ -17,81 +19,94 @@ class RemoteHotStore:
     Reads hot store data from the collector via HTTP API.
     Drop-in replacement for HotStore in the detector and agent.
     """
+    
+    def __init__(self):
+        # Keep-alive connections to the collector, reused across calls -
+        # the detector queries every tick and the agent's steps in parallel
+        self._session = requests.Session()
+        self._session.mount(
+            "http://", HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        )
 
-    def get_recent_latency(self, endpoint: str, minutes: int) -> float:
+    def _get(self, path: str, params: Optional[dict] = None) -> dict:
+        """
+        GET a /query route and decode the JSON body.
+        Returns {} when the collector is unreachable or answers with an
+        error, so callers fall back to their defaults with a plain .get.
+        """
         try:
-            resp = requests.get(
-                f"{BASE_URL}/query/latency",
-                params={"endpoint": endpoint, "minutes": minutes},
-                timeout=2
+            resp = self._session.get(
+                f"{BASE_URL}{path}", params=params, timeout=2
             )
-            return resp.json().get("latency", 0.0)
+            if resp.status_code != 200:
+                logger.error(f"RemoteHotStore {path}: HTTP {resp.status_code}")
+                return {}
+            return orjson.loads(resp.content)
         except Exception as e:
             logger.error(f"RemoteHotStore error: {e}")
-            return 0.0
+            return {}
+
+    def get_recent_latency(self, endpoint: str, minutes: int) -> float:
+        return self._get(
+            "/query/latency", {"endpoint": endpoint, "minutes": minutes}
+        ).get("latency", 0.0)
+
+    def get_latencies_bulk(self, endpoints: List[str],
+                           windows: List[int]) -> Dict[str, Dict[int, float]]:
+        if not endpoints or not windows:
+            return {}
+        latencies = self._get(
+            "/query/latencies", {"endpoint": endpoints, "minutes": windows}
+        ).get("latencies")
+        if latencies is None:
+            return {ep: {w: 0.0 for w in windows} for ep in endpoints}
+        # JSON object keys come back as strings
+        return {
+            ep: {int(w): value for w, value in by_window.items()}
+            for ep, by_window in latencies.items()
+        }
 
     def get_all_endpoints(self) -> List[str]:
-        try:
-            resp = requests.get(f"{BASE_URL}/query/endpoints", timeout=2)
-            return resp.json().get("endpoints", [])
-        except Exception:
-            return []
+        return self._get("/query/endpoints").get("endpoints", [])
 
     def get_query_count_trend(self, endpoint: str) -> List[dict]:
-        try:
-            resp = requests.get(
-                f"{BASE_URL}/query/query_trend",
-                params={"endpoint": endpoint},
-                timeout=2
-            )
-            return resp.json().get("trend", [])
-        except Exception:
-            return []
+        return self._get(
+            "/query/query_trend", {"endpoint": endpoint}
+        ).get("trend", [])
+
+    def get_trend(self, endpoint: str) -> List[dict]:
+        return self._get("/query/trend", {"endpoint": endpoint}).get("trend", [])
+
+    def get_current_metrics(self, minutes: int) -> Dict[str, Dict[str, float]]:
+        return self._get(
+            "/query/current_metrics", {"minutes": minutes}
+        ).get("metrics", {})
 
     def get_affected_users(self, endpoint: str, since: datetime,
-                           latency_threshold_ms: float) -> List[str]:
-        try:
-            resp = requests.get(
-                f"{BASE_URL}/query/affected_users",
-                params={
-                    "endpoint": endpoint,
-                    "threshold": latency_threshold_ms,
-                    "since": since.isoformat()
-                },
-                timeout=2
-            )
-            return resp.json().get("user_ids", [])
-        except Exception:
-            return []
+                           latency_threshold_ms: float,
+                           limit: Optional[int] = None) -> List[str]:
+        return self._get("/query/affected_users", {
+            "endpoint": endpoint,
+            "threshold": latency_threshold_ms,
+            "since": since.isoformat(),
+            "limit": limit
+        }).get("user_ids", [])
 
     def get_recent_commit_shas(self, endpoint: str) -> List[str]:
-        try:
-            resp = requests.get(
-                f"{BASE_URL}/query/commit_shas",
-                params={"endpoint": endpoint},
-                timeout=2
-            )
-            return resp.json().get("shas", [])
-        except Exception:
-            return []
+        return self._get(
+            "/query/commit_shas", {"endpoint": endpoint}
+        ).get("shas", [])
 
     def get_event_count(self) -> int:
-        try:
-            resp = requests.get(f"{BASE_URL}/query/event_count", timeout=2)
-            return resp.json().get("count", 0)
-        except Exception:
-            return 0
+        return self._get("/query/event_count").get("count", 0)
 
     def get_latency_trend(self, endpoint: str) -> List[dict]:
-        try:
-            resp = requests.get(
-                f"{BASE_URL}/query/latency",
-                params={"endpoint": endpoint, "minutes": 30},
-                timeout=2
-            )
-            return [{"avg_latency": resp.json().get("latency", 0)}]
-        except Exception:
+        result = self._get(
+            "/query/latency", {"endpoint": endpoint, "minutes": 30}
+        )
+        if not result:
             return []
+        return [{"avg_latency": result.get("latency", 0)}]
 
     def get_stats_before_commit(self, endpoint: str, commit_sha: str) -> dict:
         # Simplified - return recent latency as baseline
@@ -0,0 +1,96 @@
+# Folder: firetiger-demo/storage/step_cache.py
+#
+# Remembers the output of each investigation step.
+# Keyed on (commit_sha, endpoint, step), so if an investigation
+# fails halfway, e.g. a Claude API error in step 5, a retry for the
+# same bad deploy skips straight past the steps that already succeeded.
+#
+# Only for resuming: entries expire after STEP_CACHE_TTL_SEC and are
+# cleared once an investigation completes, so a later regression on
+# the same commit (a flap, a failed rollback) is investigated afresh.
+# A new commit on an endpoint wipes that endpoint's old entries -
+# results for a previous deploy are never reused.
+
+import sqlite3
+import json
+import threading
+import time
+from typing import List, Optional, Type, Union
+from pydantic import BaseModel
+import config
+
+StepResult = Union[BaseModel, List[BaseModel]]
+
+
+class StepCache:
+    """
+    SQLite-backed store of pydantic step results.
+    Single models and lists of models (hypotheses) are both supported.
+    """
+
+    def __init__(self, db_path: str = config.STEP_CACHE_DB_PATH,
+                 ttl_sec: float = config.STEP_CACHE_TTL_SEC):
+        self.ttl_sec = ttl_sec
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self._lock = threading.Lock()
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS step_results (
+                commit_sha  TEXT NOT NULL,
+                endpoint    TEXT NOT NULL,
+                step        TEXT NOT NULL,
+                result      TEXT NOT NULL,
+                created_at  REAL NOT NULL,
+                PRIMARY KEY (commit_sha, endpoint, step)
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, commit_sha: str, endpoint: str, step: str,
+            model: Type[BaseModel]) -> Optional[StepResult]:
+        """Cached result for a step, or None if it hasn't completed yet"""
+        with self._lock:
+            row = self.conn.execute("""
+                SELECT result FROM step_results
+                WHERE commit_sha = ? AND endpoint = ? AND step = ?
+                  AND created_at > ?
+            """, [commit_sha, endpoint, step,
+                  time.time() - self.ttl_sec]).fetchone()
+
+        if row is None:
+            return None
+
+        data = json.loads(row[0])
+        if isinstance(data, list):
+            return [model.model_validate(item) for item in data]
+        return model.model_validate(data)
+
+    def put(self, commit_sha: str, endpoint: str, step: str,
+            result: StepResult):
+        """Store a completed step, dropping results from older commits"""
+        if isinstance(result, list):
+            payload = json.dumps([r.model_dump(mode="json") for r in result])
+        else:
+            payload = result.model_dump_json()
+
+        with self._lock:
+            self.conn.execute("""
+                DELETE FROM step_results
+                WHERE endpoint = ? AND commit_sha != ?
+            """, [endpoint, commit_sha])
+            self.conn.execute("""
+                INSERT OR REPLACE INTO step_results
+                    (commit_sha, endpoint, step, result, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, [commit_sha, endpoint, step, payload, time.time()])
+            self.conn.commit()
+
+    def clear(self, commit_sha: str, endpoint: str):
+        """Drop every step of a finished investigation"""
+        with self._lock:
+            self.conn.execute("""
+                DELETE FROM step_results
+                WHERE commit_sha = ? AND endpoint = ?
+            """, [commit_sha, endpoint])
+            self.conn.commit()
@@ -4,9 +4,12 @@ import time
 
 app = Flask(__name__)
 
+# Fixed body, serialized once
+_HEALTH_RESPONSE = (b'{"status":"ok"}', 200, {"Content-Type": "application/json"})
+
 @app.route("/health")
 def health():
-    return {"status": "ok"}
+    return _HEALTH_RESPONSE
 
 if __name__ == "__main__":
     app.run(port=5001, debug=False)
\ No newline at end of file
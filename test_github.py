@@ -1,10 +1,19 @@
 # test_github.py
-from github import Github
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
 
-g = Github(os.getenv("GITHUB_TOKEN"))
-repo = g.get_repo(os.getenv("GITHUB_REPO"))
-print(f"✅ Connected to repo: {repo.full_name}")
\ No newline at end of file
+def main():
+    # Imported here, so importing this file (e.g. pytest collection)
+    # neither loads the SDK nor makes an API call
+    from github import Github
+    
+    load_dotenv()
+    
+    g = Github(os.getenv("GITHUB_TOKEN"))
+    repo = g.get_repo(os.getenv("GITHUB_REPO"))
+    print(f"✅ Connected to repo: {repo.full_name}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,15 +1,24 @@
 # test_slack.py
-from slack_sdk import WebClient
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
 
-client = WebClient(token=os.getenv("SLACK_BOT_TOKEN"))
+def main():
+    # Imported here, so importing this file (e.g. pytest collection)
+    # neither loads the SDK nor posts a message
+    from slack_sdk import WebClient
+    
+    load_dotenv()
+    
+    client = WebClient(token=os.getenv("SLACK_BOT_TOKEN"))
+    
+    client.chat_postMessage(
+        channel=os.getenv("SLACK_CHANNEL_ID"),
+        text="✅ Argus connected successfully"
+    )
+    
+    print("Slack message sent!")
 
-client.chat_postMessage(
-    channel=os.getenv("SLACK_CHANNEL_ID"),
-    text="✅ Argus connected successfully"
-)
 
-print("Slack message sent!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,5 @@
+# Folder: firetiger-demo/tests/conftest.py
+# Lets the tests import the project packages from the repo root.
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,83 @@
+# Folder: firetiger-demo/tests/test_cold_store.py
+#
+# Compaction that dies before deleting its sources must not double
+# count rows, and a rerun must not merge a compacted hour again.
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import config
+from ingestion.event_schema import EventSchema
+from storage.cold_store import ColdStore
+
+
+def _event(i: int, when: datetime) -> EventSchema:
+    return EventSchema(
+        timestamp=when - timedelta(minutes=i % 50),
+        endpoint="/checkout",
+        method="GET",
+        status_code=200,
+        latency_ms=float(i),
+        db_query_count=3,
+        db_query_time_ms=1.0,
+        user_id="u",
+        session_id="s",
+        memory_mb=50.0,
+        commit_sha="abc",
+        error_message=None,
+    )
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    store = ColdStore()
+    # Four flushes into a closed hour
+    hour = datetime.now().replace(minute=55) - timedelta(hours=2)
+    for flush in range(4):
+        store.flush([_event(flush * 10 + i, hour) for i in range(10)])
+    return store
+
+
+def _files(store):
+    return sorted(
+        os.path.basename(f) for f in store.recent_files(4)
+    )
+
+
+def test_compaction_merges_closed_hour(store):
+    store.compact_closed_partitions()
+
+    assert len(_files(store)) == 1
+    assert store.read_historical("/checkout", 4).num_rows == 40
+
+
+def test_crash_before_unlink_does_not_double_count(store, monkeypatch):
+    def crash(path):
+        raise RuntimeError("killed")
+
+    with monkeypatch.context() as m:
+        m.setattr(os, "remove", crash)
+        with pytest.raises(RuntimeError):
+            store.compact_closed_partitions()
+
+    # Merged file and its sources are both on disk - only one is read
+    assert store.read_historical("/checkout", 4).num_rows == 40
+
+    # The rerun finishes the cleanup instead of merging again
+    store.compact_closed_partitions()
+    partition = os.path.dirname(store.recent_files(4)[0])
+    assert os.listdir(partition) == _files(store)
+    assert len(_files(store)) == 1
+    assert store.read_historical("/checkout", 4).num_rows == 40
+
+
+def test_rerun_leaves_compacted_file_alone(store):
+    store.compact_closed_partitions()
+    compacted = _files(store)
+
+    store.compact_closed_partitions()
+
+    assert _files(store) == compacted
@@ -0,0 +1,50 @@
+# Folder: firetiger-demo/tests/test_github_pr.py
+#
+# Claude's exact fix wins over the USE_SLOW_QUERY fallback, wherever
+# in the file each one appears.
+
+from actions.github_pr import _apply_fix, SLOW_QUERY_SWITCH, SLOW_QUERY_SWITCH_FIX
+
+
+class _Fix:
+    def __init__(self, original_code: str, fixed_code: str):
+        self.original_code = original_code
+        self.fixed_code = fixed_code
+
+
+class _Report:
+    def __init__(self, original_code: str, fixed_code: str):
+        self.fix = _Fix(original_code, fixed_code)
+
+
+SOURCE = (
+    "def get_checkout_total(cart_id):\n"
+    f"    {SLOW_QUERY_SWITCH}\n"
+    "        slow()\n"
+    "    for item in items:\n"
+    "        fetch_product(item)\n"
+)
+
+
+def test_exact_match_below_switch_line_wins():
+    report = _Report("    for item in items:\n", "    for item in joined:\n")
+
+    fixed = _apply_fix(report, SOURCE)
+
+    assert "for item in joined:" in fixed
+    assert SLOW_QUERY_SWITCH_FIX not in fixed
+
+
+def test_falls_back_to_switch_line():
+    report = _Report("not in the file", "whatever")
+
+    fixed = _apply_fix(report, SOURCE)
+
+    assert SLOW_QUERY_SWITCH_FIX in fixed
+    assert SLOW_QUERY_SWITCH not in fixed
+
+
+def test_leaves_content_alone_when_nothing_matches():
+    report = _Report("not in the file", "whatever")
+
+    assert _apply_fix(report, "print('hi')\n") == "print('hi')\n"
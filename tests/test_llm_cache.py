@@ -0,0 +1,79 @@
+# Folder: firetiger-demo/tests/test_llm_cache.py
+#
+# cached_tool_call only caches tool input that is complete and fits
+# the step's output model - a bad answer is never replayed.
+
+from types import SimpleNamespace
+import pytest
+import agent.llm_cache as llm_cache
+from agent.llm_cache import PromptCache, cached_tool_call
+from ingestion.event_schema import RootCause
+
+VALID_INPUT = {
+    "confirmed_hypothesis_title": "N+1 Query Problem",
+    "confidence_score": 0.95,
+    "evidence_chain": ["201 queries per request"],
+    "affected_code_location": "app/db.py get_checkout_total",
+    "affected_code_snippet": "for item in items:",
+}
+
+
+class FakeClient:
+    """Answers each messages.create with the next queued tool input"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        tool_input, stop_reason = self.responses.pop(0)
+        return SimpleNamespace(
+            stop_reason=stop_reason,
+            content=[SimpleNamespace(type="tool_use", input=tool_input)],
+        )
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        llm_cache, "prompt_cache", PromptCache(str(tmp_path / "llm.db"))
+    )
+
+
+def _call(client):
+    return cached_tool_call(
+        client, "claude-opus-4-6", "prompt", 1000, "confirm_root_cause",
+        "submit_root_cause", RootCause
+    )
+
+
+def test_valid_answer_is_cached():
+    client = FakeClient((VALID_INPUT, "tool_use"))
+
+    assert _call(client) == VALID_INPUT
+    assert _call(client) == VALID_INPUT
+    assert client.calls == 1
+
+
+def test_truncated_answer_is_not_cached():
+    partial = {"confirmed_hypothesis_title": "N+1 Query Problem"}
+    client = FakeClient((partial, "max_tokens"), (VALID_INPUT, "tool_use"))
+
+    with pytest.raises(ValueError):
+        _call(client)
+
+    assert _call(client) == VALID_INPUT
+    assert client.calls == 2
+
+
+def test_invalid_answer_is_not_cached():
+    invalid = dict(VALID_INPUT, confidence_score="very")
+    client = FakeClient((invalid, "tool_use"), (VALID_INPUT, "tool_use"))
+
+    with pytest.raises(ValueError):
+        _call(client)
+
+    assert _call(client) == VALID_INPUT
+    assert client.calls == 2
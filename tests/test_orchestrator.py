@@ -0,0 +1,140 @@
+# Folder: firetiger-demo/tests/test_orchestrator.py
+#
+# The step cache only lets a failed investigation resume - a later
+# regression on the same commit must run every step again.
+
+from datetime import datetime
+import pytest
+import agent.orchestrator as orchestrator
+from agent.orchestrator import AgentOrchestrator
+from ingestion.event_schema import (
+    RegressionEvent, Characterization, Hypothesis, RootCause, FixPackage
+)
+from storage.step_cache import StepCache
+
+
+class FakeKnowledgeGraph:
+    def save_incident(self, incident_data: dict) -> int:
+        return 1
+
+
+def _regression() -> RegressionEvent:
+    return RegressionEvent(
+        affected_endpoint="/checkout",
+        anomaly_score=12.0,
+        latency_before_ms=10.0,
+        latency_after_ms=120.0,
+        query_count_before=1.0,
+        query_count_after=201.0,
+        commit_sha="abc1234",
+        affected_user_ids=["u1"],
+    )
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Stub every step, counting how often each one really runs"""
+    counts = {"characterize": 0, "hypothesize": 0, "confirm": 0, "fix": 0}
+    failures = {"fix": 0}
+
+    def characterize(regression, hot_store):
+        counts["characterize"] += 1
+        return Characterization(
+            affected_endpoint=regression.affected_endpoint,
+            all_endpoints_affected=False,
+            affected_user_ids=regression.affected_user_ids,
+            regression_start_time=datetime.now(),
+            commit_sha=regression.commit_sha,
+            latency_before_ms=10.0, latency_after_ms=120.0,
+            latency_multiplier=12.0,
+            query_count_before=1.0, query_count_after=201.0,
+            query_multiplier=201.0,
+            db_time_before_ms=8.0, db_time_after_ms=100.0,
+            memory_before_mb=50.0, memory_after_mb=50.0,
+        )
+
+    def hypothesize(char, kg):
+        counts["hypothesize"] += 1
+        return [Hypothesis(
+            rank=1, title="N+1 Query Problem", description="loop",
+            confidence_score=0.9, supporting_signals=[], evidence_needed=[],
+        )]
+
+    def confirm_root_cause(hypotheses, evidence):
+        counts["confirm"] += 1
+        return RootCause(
+            confirmed_hypothesis_title="N+1 Query Problem",
+            confidence_score=0.95, evidence_chain=[],
+            affected_code_location="app/db.py", affected_code_snippet="",
+        )
+
+    def generate_fix(root_cause, char):
+        counts["fix"] += 1
+        if failures["fix"]:
+            failures["fix"] -= 1
+            raise RuntimeError("Claude API error")
+        return FixPackage(
+            fix_summary="join", original_code="a", fixed_code="b",
+            explanation="", risk_level="low", risk_reasoning="",
+            side_effects=[], rollback_instructions="",
+            verification_checklist=[], pr_title="Fix", pr_description="",
+        )
+
+    monkeypatch.setattr(orchestrator, "characterize", characterize)
+    monkeypatch.setattr(orchestrator, "hypothesize", hypothesize)
+    monkeypatch.setattr(orchestrator, "confirm_root_cause", confirm_root_cause)
+    monkeypatch.setattr(orchestrator, "generate_fix", generate_fix)
+    monkeypatch.setattr(orchestrator, "gather_evidence", lambda *a, **kw: [])
+    monkeypatch.setattr(
+        orchestrator, "gather_shared_evidence", lambda *a, **kw: {}
+    )
+    monkeypatch.setattr(AgentOrchestrator, "_warm_claude", lambda self: None)
+    counts["failures"] = failures
+    return counts
+
+
+def _orchestrator(tmp_path, ttl_sec: float = 300) -> AgentOrchestrator:
+    return AgentOrchestrator(
+        hot_store=None,
+        knowledge_graph=FakeKnowledgeGraph(),
+        step_cache=StepCache(str(tmp_path / "steps.db"), ttl_sec=ttl_sec),
+    )
+
+
+def test_second_detection_on_same_commit_recomputes_steps(tmp_path, calls):
+    agent = _orchestrator(tmp_path)
+
+    agent.investigate(_regression())
+    agent.investigate(_regression())
+
+    assert calls["characterize"] == 2
+    assert calls["hypothesize"] == 2
+    assert calls["confirm"] == 2
+    assert calls["fix"] == 2
+
+
+def test_failed_investigation_resumes_but_recharacterizes(tmp_path, calls):
+    agent = _orchestrator(tmp_path)
+    calls["failures"]["fix"] = 1
+
+    with pytest.raises(RuntimeError):
+        agent.investigate(_regression())
+    agent.investigate(_regression())
+
+    # Live metrics are read again; the Claude steps that finished are reused
+    assert calls["characterize"] == 2
+    assert calls["hypothesize"] == 1
+    assert calls["confirm"] == 1
+    assert calls["fix"] == 2
+
+
+def test_stale_steps_are_not_reused(tmp_path, calls):
+    agent = _orchestrator(tmp_path, ttl_sec=0)
+    calls["failures"]["fix"] = 1
+
+    with pytest.raises(RuntimeError):
+        agent.investigate(_regression())
+    agent.investigate(_regression())
+
+    assert calls["hypothesize"] == 2
+    assert calls["confirm"] == 2